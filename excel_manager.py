@@ -1,34 +1,212 @@
+import atexit
+import functools
+import io
+import itertools
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 import openpyxl
 from openpyxl import Workbook
 from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter, column_index_from_string
-from openpyxl.utils.cell import coordinate_from_string, coordinate_to_tuple
+from openpyxl.utils.cell import coordinate_to_tuple
+from openpyxl.cell.read_only import EMPTY_CELL
 import re
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("excel_manager.log"),
-        logging.StreamHandler()
-    ]
-)
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # Optional faster read backend
+    CalamineWorkbook = None
+
+# Library logging - nothing is emitted unless the application opts in with
+# configure_logging() or attaches its own handlers
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+_log_listener = None
+_queue_handler = None
+_log_config = None  # (path, level) of the current configuration
+
+def configure_logging(path=None, level=logging.INFO):
+    """
+    Send excel_manager log records to the console and, if a path is given, to a file.
+    
+    Records are handed to a queue and written by a background listener, so callers
+    never block on log I/O. Calling this again with a different path or level replaces
+    the previous configuration; the same arguments keep it (Streamlit reruns the app
+    script on every interaction).
+    """
+    global _log_listener, _queue_handler, _log_config
+    if _log_listener is not None and _log_config == (path, level):
+        return
+    logger = logging.getLogger(__name__)
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        logger.removeHandler(_queue_handler)
+    
+    log_queue = queue.Queue(-1)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [logging.StreamHandler()]
+    if path:
+        handlers.append(logging.FileHandler(path))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    
+    _queue_handler = QueueHandler(log_queue)
+    _queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Final formatting happens in the listener
+    logger.addHandler(_queue_handler)
+    logger.setLevel(level)
+    _log_config = (path, level)
+
+def _stop_logging():
+    if _log_listener is not None:
+        _log_listener.stop()
+
+atexit.register(_stop_logging)
+
+# A1-style cell reference, optionally with '$' absolute markers
+_CELL_RE = re.compile(r"^\$?([A-Za-z]{1,3})\$?(\d+)$")
+_MAX_COLUMN = 16384  # XFD
+
+# Bound formatters for numbers - commas and always 2 decimal places
+_format_number = "{:,.2f}".format
+_format_currency = "${:,.2f}".format
+
+@functools.lru_cache(maxsize=4096)
+def _split_cell_reference(cell_reference):
+    """
+    Split a reference like 'A1' or 'Sheet2!B3' into (sheet_name, row, column).
+    
+    sheet_name is None when the reference has no sheet part. Returns None if the
+    cell part is not a valid A1 reference.
+    """
+    sheet_name = None
+    if '!' in cell_reference:
+        parts = cell_reference.split('!')
+        sheet_name = parts[0].strip("'")
+        cell_reference = parts[1]
+    
+    match = _CELL_RE.match(cell_reference)
+    if not match:
+        return None
+    
+    column = column_index_from_string(match.group(1).upper())
+    row = int(match.group(2))
+    if not row or column > _MAX_COLUMN:
+        return None
+    return sheet_name, row, column
+
+
+class _CalamineCell:
+    """
+    Read-only cell returned by the calamine shim. Calamine does not expose cell
+    styles, so there is never a number format.
+    """
+    __slots__ = ('value',)
+    number_format = None
+    
+    def __init__(self, value):
+        self.value = value
+
+
+class _CalamineSheet:
+    """
+    Minimal stand-in for an openpyxl read-only worksheet, backed by the rows of a
+    python-calamine sheet. Supports the iter_rows calls used by excelManager.
+    """
+    def __init__(self, sheet):
+        # Calamine reports empty cells as '' - use None like openpyxl does
+        self._rows = [[None if value == '' else value for value in row]
+                      for row in sheet.to_python(skip_empty_area=False)]
+        
+        # Calamine's grid includes formatted but empty rows at the bottom. Drop them
+        # so column scans stop at the last populated row instead of walking blanks.
+        while self._rows and not any(value is not None for value in self._rows[-1]):
+            self._rows.pop()
+        self.max_row = len(self._rows)
+        self.max_column = max((len(row) for row in self._rows), default=0)
+    
+    def iter_rows(self, min_row=1, max_row=None, min_col=1, max_col=None, values_only=False):
+        max_row = max_row or self.max_row
+        max_col = max_col or self.max_column
+        width = max_col - min_col + 1
+        for row in self._rows[min_row - 1:max_row]:
+            values = row[min_col - 1:max_col]
+            values = values + [None] * (width - len(values))
+            yield tuple(values) if values_only else tuple(_CalamineCell(value) for value in values)
+
+
+class _CalamineWorkbook:
+    """
+    Minimal stand-in for an openpyxl read-only workbook, backed by python-calamine.
+    Sheets are converted on first access.
+    """
+    def __init__(self, source):
+        self._workbook = CalamineWorkbook.from_filelike(source)
+        self._sheets = {}
+    
+    @property
+    def sheetnames(self):
+        return list(self._workbook.sheet_names)
+    
+    def __getitem__(self, sheet_name):
+        if sheet_name not in self._sheets:
+            self._sheets[sheet_name] = _CalamineSheet(self._workbook.get_sheet_by_name(sheet_name))
+        return self._sheets[sheet_name]
+    
+    def close(self):
+        self._sheets.clear()
+
 
 class excelManager:
-    def __init__(self, file_path=None):
+    MODES = ("rw", "r", "w")
+    READ_BACKENDS = ("openpyxl", "calamine")
+    
+    def __init__(self, file_path=None, mode="rw", read_backend="openpyxl"):
         """
         Initialize the ExcelManager with an optional file path.
         If no file path is provided, operations will require a file path.
+        
+        file_path may also be a file-like object such as an uploaded file. The
+        workbook is then read from memory and save() needs an explicit path.
+        
+        The mode limits which workbooks are ever built:
+        - "rw": read calculated values and write (default)
+        - "r": read only - the formula workbook is not needed and writes raise
+        - "w": write only - the calculated-value workbook is never loaded and reads raise
+        
+        read_backend selects the parser for calculated values. "calamine" uses the
+        optional python-calamine package, which parses much faster than openpyxl but
+        cannot see cell styles, so currency formats are not applied.
         """
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid mode: {mode}. Expected one of {', '.join(self.MODES)}")
+        if read_backend not in self.READ_BACKENDS:
+            raise ValueError(f"Invalid read backend: {read_backend}. Expected one of {', '.join(self.READ_BACKENDS)}")
+        if read_backend == "calamine" and CalamineWorkbook is None:
+            raise ImportError("python-calamine is required for the 'calamine' read backend")
+        
         self.logger = logging.getLogger(__name__)
+        self.mode = mode
+        self.read_backend = read_backend
         self.file_path = file_path
         self.workbook = None
         self.formula_workbook = None
-        
-        if file_path and os.path.exists(file_path):
+        self._values_dirty = False  # Formula workbook changed since the values were loaded
+        self._values_stale = False  # File on disk is newer than the loaded values
+        self._saved_data = None  # Bytes of the last save, kept while the values are stale
+        self._source_data = None  # Bytes of a workbook loaded from a file-like object
+        self._header_cache = {}  # (sheet, row) -> {lowercase title: [columns]}
+        self._rows_cache = {}  # sheet -> cells of the value workbook sheet, one tuple per row
+        
+        if hasattr(file_path, 'read'):
+            self.load_workbook(file_path)
+            self.logger.info("Initialized ExcelManager from a file-like object")
+        elif file_path and os.path.exists(file_path):
             self.load_workbook(file_path)
             self.logger.info(f"Initialized ExcelManager with existing file: {file_path}")
         elif file_path:
@@ -46,54 +224,132 @@ class excelManager:
             self.logger.error("No file path provided")
             raise ValueError("File path is required to create a workbook")
         
-        self.workbook = Workbook()
+        if self.mode == "r":
+            self.logger.error("Cannot create a workbook in read-only mode")
+            raise ValueError("Cannot create a workbook in read-only mode ('r')")
+        
+        self.workbook = None
         # Create a separate workbook for formulas
         self.formula_workbook = Workbook()
         self.file_path = path
+        self._values_dirty = True
         self.save()
         self.logger.info(f"Created new workbook at {path}")
         return self.workbook
     
     def load_workbook(self, file_path=None):
         """
-        Load an existing Excel workbook.
+        Load an existing Excel workbook from a path or a file-like object.
         """
         path = file_path or self.file_path
         if not path:
             self.logger.error("No file path provided")
             raise ValueError("File path is required to load a workbook")
         
-        if not os.path.exists(path):
+        if hasattr(path, 'read'):
+            # Keep the bytes in memory - there is no file on disk to go back to
+            self._source_data = path.read()
+            self.file_path = None
+        elif not os.path.exists(path):
             self.logger.error(f"File does not exist: {path}")
             raise FileNotFoundError(f"File does not exist: {path}")
+        else:
+            self._source_data = None
+            self.file_path = path
         
-        # Load two versions of the workbook - one with formulas and one with calculated values
-        self.formula_workbook = load_workbook(path, data_only=False)
-        self.workbook = load_workbook(path, data_only=True)
-        self.file_path = path
-        self.logger.info(f"Loaded workbook from {path}")
+        # Load the calculated values as a streaming read-only workbook; the full
+        # formula workbook is only built when a caller actually needs it
+        self.formula_workbook = None
+        self._saved_data = None
+        if self.mode == "w":
+            # Write-only: the formula workbook is all that is ever needed
+            self._get_formula_wb()
+        else:
+            self._refresh_values()
+        self.logger.info(f"Loaded workbook from {self.file_path or 'memory'}")
         return self.workbook
     
+    def _refresh_values(self):
+        """
+        (Re)load the read-only calculated-value workbook from the file on disk.
+        
+        The file is read into memory first so that the streaming reader does not
+        hold the file open - save() can then overwrite it without invalidating
+        a value workbook that is still up to date. After a save the bytes that
+        were written are reused, so the file is not read back at all.
+        """
+        if self.workbook:
+            self.workbook.close()
+        if self._saved_data is not None:
+            data = io.BytesIO(self._saved_data)
+            self._saved_data = None
+        elif self._source_data is not None:
+            data = io.BytesIO(self._source_data)
+        else:
+            with open(self.file_path, 'rb') as f:
+                data = io.BytesIO(f.read())
+        if self.read_backend == "calamine":
+            self.workbook = _CalamineWorkbook(data)
+        else:
+            self.workbook = load_workbook(data, read_only=True, data_only=True, keep_links=False)
+            # The streaming reader trusts the stored <dimension>, which some writers leave
+            # stale or missing - drop it so rows are read until the data actually ends
+            for sheet in self.workbook.worksheets:
+                sheet.reset_dimensions()
+        self._header_cache.clear()
+        self._rows_cache.clear()
+        self._values_dirty = False
+        self._values_stale = False
+    
+    def _mark_dirty(self):
+        """
+        Record that the formula workbook changed since the values were loaded.
+        """
+        self._values_dirty = True
+    
+    def _get_formula_wb(self):
+        """
+        Return the formula workbook, loading it on first access.
+        """
+        if self.formula_workbook is None:
+            if self._source_data is not None:
+                self.formula_workbook = load_workbook(io.BytesIO(self._source_data), data_only=False)
+                self.logger.info("Loaded formula workbook from memory")
+                return self.formula_workbook
+            if not self.file_path or not os.path.exists(self.file_path):
+                self.logger.error("No workbook loaded")
+                raise ValueError("No workbook loaded")
+            self.formula_workbook = load_workbook(self.file_path, data_only=False)
+            self.logger.info(f"Loaded formula workbook from {self.file_path}")
+        return self.formula_workbook
+    
     def save(self, file_path=None):
         """
         Save the workbook to disk.
         """
-        if not self.formula_workbook:
-            self.logger.error("No workbook loaded")
-            raise ValueError("No workbook loaded")
+        self._check_writable()
         
         path = file_path or self.file_path
         if not path:
             self.logger.error("No file path provided")
             raise ValueError("File path is required to save a workbook")
         
-        # Always save the formula workbook as it contains both formulas and structure
-        self.formula_workbook.save(path)
+        # Always save the formula workbook as it contains both formulas and structure.
+        # It is serialized to memory first so the value reload can reuse the bytes.
+        buffer = io.BytesIO()
+        self._get_formula_wb().save(buffer)
+        with open(path, 'wb') as f:
+            f.write(buffer.getbuffer())
         self.file_path = path
+        self._source_data = None  # The file on disk is the source from now on
         
-        # Reload both workbooks to keep them in sync
-        self.formula_workbook = load_workbook(path, data_only=False)
-        self.workbook = load_workbook(path, data_only=True)
+        # The in-memory formula workbook is what was just written, so it stays as is.
+        # The calculated values only need reloading if something was changed, and
+        # even then only when something reads them (see _check_readable).
+        if self._values_dirty and self.mode != "w":
+            self._values_dirty = False
+            self._values_stale = True
+            self._saved_data = buffer.getvalue()
         
         self.logger.info(f"Saved workbook to {path}")
     
@@ -107,17 +363,61 @@ class excelManager:
         if self.formula_workbook:
             self.formula_workbook.close()
             self.formula_workbook = None
+        self._values_stale = False
+        self._saved_data = None
+        self._source_data = None
         self.logger.info("Closed workbook")
     
-    def count_sheets(self):
+    def _check_loaded(self):
         """
-        Return the number of sheets in the workbook.
+        Raise if no workbook is loaded.
         """
-        if not self.formula_workbook:
+        if self.workbook is None and self.formula_workbook is None:
             self.logger.error("No workbook loaded")
             raise ValueError("No workbook loaded")
+    
+    def _check_readable(self):
+        """
+        Raise if calculated values cannot be read in the current mode, and reload
+        them first if a save has made them stale.
+        """
+        if self.mode == "w":
+            self.logger.error("Cannot read values in write-only mode")
+            raise ValueError("Cannot read values from a workbook opened in write-only mode ('w')")
+        self._check_loaded()
+        if self._values_stale:
+            # A save changed the file since the values were loaded - reload them now
+            self._refresh_values()
+    
+    def _check_writable(self):
+        """
+        Raise if the workbook cannot be modified in the current mode.
+        """
+        if self.mode == "r":
+            self.logger.error("Cannot modify a workbook in read-only mode")
+            raise ValueError("Cannot modify a workbook opened in read-only mode ('r')")
+        self._check_loaded()
+    
+    def _sheet_names(self):
+        """
+        Return the sheet names that reads see, so a listed sheet can always be read.
+        
+        Created and deleted sheets show up after the next save(), like any other
+        change. Write-only workbooks have no value workbook and list the sheets of
+        the formula workbook instead.
+        """
+        if self.mode == "w":
+            return self._get_formula_wb().sheetnames
+        self._check_readable()
+        return self.workbook.sheetnames
+    
+    def count_sheets(self):
+        """
+        Return the number of sheets in the workbook.
+        """
+        self._check_loaded()
         
-        count = len(self.formula_workbook.sheetnames)
+        count = len(self._sheet_names())
         self.logger.info(f"Counted {count} sheets")
         return count
     
@@ -125,29 +425,28 @@ class excelManager:
         """
         Return the names of the sheets in the workbook.
         """
-        if not self.formula_workbook:
-            self.logger.error("No workbook loaded")
-            raise ValueError("No workbook loaded")
+        self._check_loaded()
         
-        names = self.formula_workbook.sheetnames
+        names = self._sheet_names()
         self.logger.info(f"Retrieved sheet names: {names}")
         return names
     
     def create_sheet(self, sheet_name):
         """
         Create a new sheet in the workbook.
+        
+        The sheet is created in the formula workbook; it is listed by
+        get_sheet_names() and becomes readable after the next save().
         """
-        if not self.formula_workbook:
-            self.logger.error("No workbook loaded")
-            raise ValueError("No workbook loaded")
+        self._check_writable()
         
-        if sheet_name in self.formula_workbook.sheetnames:
+        formula_workbook = self._get_formula_wb()
+        if sheet_name in formula_workbook.sheetnames:
             self.logger.warning(f"Sheet {sheet_name} already exists")
-            return self.formula_workbook[sheet_name]
+            return formula_workbook[sheet_name]
         
-        # Create sheet in both workbooks
-        formula_sheet = self.formula_workbook.create_sheet(sheet_name)
-        value_sheet = self.workbook.create_sheet(sheet_name)
+        formula_sheet = formula_workbook.create_sheet(sheet_name)
+        self._mark_dirty()
         
         self.logger.info(f"Created new sheet: {sheet_name}")
         return formula_sheet
@@ -156,34 +455,33 @@ class excelManager:
         """
         Get a sheet by name.
         """
-        if not self.formula_workbook:
-            self.logger.error("No workbook loaded")
-            raise ValueError("No workbook loaded")
+        self._check_loaded()
         
-        if sheet_name not in self.formula_workbook.sheetnames:
+        formula_workbook = self._get_formula_wb()
+        if sheet_name not in formula_workbook.sheetnames:
             self.logger.error(f"Sheet does not exist: {sheet_name}")
             raise ValueError(f"Sheet does not exist: {sheet_name}")
         
-        formula_sheet = self.formula_workbook[sheet_name]
+        formula_sheet = formula_workbook[sheet_name]
+        self._mark_dirty()  # The caller may modify the returned sheet directly
         self.logger.info(f"Retrieved sheet: {sheet_name}")
         return formula_sheet
     
     def delete_sheet(self, sheet_name):
         """
         Delete a sheet by name.
+        
+        The sheet stays listed by get_sheet_names() and readable until the next save().
         """
-        if not self.formula_workbook:
-            self.logger.error("No workbook loaded")
-            raise ValueError("No workbook loaded")
+        self._check_writable()
         
-        if sheet_name not in self.formula_workbook.sheetnames:
+        formula_workbook = self._get_formula_wb()
+        if sheet_name not in formula_workbook.sheetnames:
             self.logger.error(f"Sheet does not exist: {sheet_name}")
             raise ValueError(f"Sheet does not exist: {sheet_name}")
         
-        # Delete from both workbooks
-        del self.formula_workbook[sheet_name]
-        if sheet_name in self.workbook.sheetnames:
-            del self.workbook[sheet_name]
+        del formula_workbook[sheet_name]
+        self._mark_dirty()
             
         self.logger.info(f"Deleted sheet: {sheet_name}")
     
@@ -195,22 +493,14 @@ class excelManager:
         - A1: same sheet, row 1, column 1
         - Sheet2!B3: Sheet2, row 3, column 2
         """
-        sheet_name = current_sheet_name
-        
-        # Check if the reference includes a sheet name
-        if '!' in cell_reference:
-            parts = cell_reference.split('!')
-            sheet_name = parts[0].strip("'")
-            cell_reference = parts[1]
-        
-        # Convert A1 reference to row, column
-        try:
-            column_letter, row = coordinate_from_string(cell_reference)
-            column = column_index_from_string(column_letter)
-        except Exception as e:
-            self.logger.error(f"Invalid cell reference: {cell_reference}. Error: {e}")
+        parsed = _split_cell_reference(cell_reference)
+        if parsed is None:
+            self.logger.error(f"Invalid cell reference: {cell_reference}")
             raise ValueError(f"Invalid cell reference: {cell_reference}")
         
+        sheet_name, row, column = parsed
+        if sheet_name is None:
+            sheet_name = current_sheet_name
         return sheet_name, row, column
     
     def _format_numeric_value(self, value, is_currency=False):
@@ -228,14 +518,140 @@ class excelManager:
             return ''
         
         if isinstance(value, (int, float)):
-            # Format with commas and always show 2 decimal places
-            formatted_value = f"{value:,.2f}"
-            if is_currency:
-                return f"${formatted_value}"
-            return formatted_value
+            return _format_currency(value) if is_currency else _format_number(value)
+        
+        return value
+    
+    def _format_cell(self, cell):
+        """
+        Format a cell from the read-only value workbook.
+        
+        The value workbook carries the same styles as the formula workbook, so the
+        currency check reads the number format from the cell being formatted and
+        never needs a second lookup in the formula workbook.
+        """
+        value = cell.value
+        if value is None:
+            return ''
+        
+        if isinstance(value, (int, float)):
+            number_format = cell.number_format
+            if number_format and '$' in number_format:
+                return _format_currency(value)
+            return _format_number(value)
         
         return value
     
+    def format_for_display(self, values, is_currency_per_col=None):
+        """
+        Format raw values from read_range(raw=True) or read_items(raw=True) the way
+        the formatted reads would.
+        
+        Args:
+            values: A 2D list of rows, or a flat list for a single column
+            is_currency_per_col: Optional list of booleans, one per column, marking
+                                 currency columns. A flat list uses the first entry.
+            
+        Returns:
+            A new list of the same shape with numbers formatted and None as ''
+        """
+        currency = is_currency_per_col or []
+        if values and isinstance(values[0], (list, tuple)):
+            return [
+                [self._format_numeric_value(value, col < len(currency) and currency[col])
+                 for col, value in enumerate(row)]
+                for row in values
+            ]
+        is_currency = bool(currency) and currency[0]
+        return [self._format_numeric_value(value, is_currency) for value in values]
+    
+    def _header_columns(self, sheet_name, row):
+        """
+        Return a {lowercase title: [columns]} map for a header row of the value workbook.
+        
+        The row is scanned once and cached, so repeated title lookups against the
+        same header row are dictionary lookups. Columns are listed left to right.
+        """
+        key = (sheet_name, row)
+        columns = self._header_cache.get(key)
+        if columns is None:
+            columns = {}
+            rows = self._sheet_rows(sheet_name)
+            cells = rows[row - 1] if row <= len(rows) else ()
+            for col, cell in enumerate(cells, start=1):
+                value = cell.value
+                if value and isinstance(value, str):
+                    columns.setdefault(value.lower(), []).append(col)
+            self._header_cache[key] = columns
+        return columns
+    
+    def _sheet_rows(self, sheet_name):
+        """
+        Return the cells of a value workbook sheet as a list of rows, parsed once and cached.
+        
+        A read-only sheet parses its XML from the start on every cell() or iter_rows()
+        call, so random access and column scans use this grid instead. Row n is
+        rows[n - 1], and a row only reaches its last stored cell.
+        """
+        rows = self._rows_cache.get(sheet_name)
+        if rows is None:
+            rows = self._rows_cache[sheet_name] = list(self.workbook[sheet_name].iter_rows())
+        return rows
+    
+    def _get_cell(self, sheet_name, row, col):
+        """
+        Return a cell of the value workbook, or an empty cell past the stored data.
+        """
+        rows = self._sheet_rows(sheet_name)
+        if row <= len(rows):
+            cells = rows[row - 1]
+            if col <= len(cells):
+                return cells[col - 1]
+        return EMPTY_CELL
+    
+    def _iter_column(self, sheet_name, start_row, col):
+        """
+        Yield (row, cell) pairs down a single column of the value workbook, starting
+        at start_row and ending at the last stored row. Callers can stop at any point.
+        """
+        rows = self._sheet_rows(sheet_name)
+        for row in range(start_row, len(rows) + 1):
+            cells = rows[row - 1]
+            yield row, cells[col - 1] if col <= len(cells) else EMPTY_CELL
+    
+    def _read_column_items(self, sheet_name, column_specs):
+        """
+        Read the items of several columns in one pass over the cached row grid, like
+        read_items does for a single column.
+        
+        column_specs is a list of (start_row, column) pairs. Each column collects
+        formatted values from its start row until its first empty cell, and the
+        pass stops as soon as every column has ended.
+        """
+        columns_data = [[] for _ in column_specs]
+        if not column_specs:
+            return columns_data
+        
+        first_row = min(start_row for start_row, _ in column_specs)
+        open_columns = set(range(len(column_specs)))
+        
+        rows = self._sheet_rows(sheet_name)
+        for row in range(first_row, len(rows) + 1):
+            cells = rows[row - 1]
+            for index in tuple(open_columns):
+                start_row, col = column_specs[index]
+                if row < start_row:
+                    continue
+                cell = cells[col - 1] if col <= len(cells) else EMPTY_CELL
+                # An empty cell ends the column
+                if cell.value is None or cell.value == '':
+                    open_columns.discard(index)
+                else:
+                    columns_data[index].append(self._format_cell(cell))
+            if not open_columns:
+                break
+        return columns_data
+    
     def read_cell(self, sheet_name, row_or_cell, column=None):
         """
         Read a cell value. 
@@ -246,9 +662,7 @@ class excelManager:
         
         Returns the calculated value, not the formula.
         """
-        if not self.workbook:
-            self.logger.error("No workbook loaded")
-            raise ValueError("No workbook loaded")
+        self._check_readable()
         
         # Get the row and column based on the input parameters
         if column is None:
@@ -268,25 +682,19 @@ class excelManager:
             self.logger.error(f"Sheet does not exist: {sheet_name}")
             raise ValueError(f"Sheet does not exist: {sheet_name}")
         
-        # Get the calculated value from the data_only workbook
-        sheet = self.workbook[sheet_name]
-        value = sheet.cell(row=row, column=col).value
-        
-        # Check if cell is formatted as currency
-        formula_cell = self.formula_workbook[sheet_name].cell(row=row, column=col)
-        is_currency = formula_cell.number_format and '$' in formula_cell.number_format
-        
-        # Format the value
-        formatted_value = self._format_numeric_value(value, is_currency)
+        # Get the calculated value from the data_only workbook and format it
+        formatted_value = self._format_cell(self._get_cell(sheet_name, row, col))
 
-        # Get the formula (if any) from the formula workbook for logging
-        formula = formula_cell.value
-        
-        cell_ref = f"{get_column_letter(col)}{row}"
-        if isinstance(formula, str) and formula.startswith('='):
-            self.logger.info(f"Read calculated value '{formatted_value}' from cell {cell_ref} in sheet {sheet_name} (formula: {formula})")
-        else:
-            self.logger.info(f"Read value '{formatted_value}' from cell {cell_ref} in sheet {sheet_name}")
+        # Per-cell logging is DEBUG only so the messages are not built on the hot path
+        if self.logger.isEnabledFor(logging.DEBUG):
+            # Get the formula (if any) from the formula workbook for logging
+            formula = self._get_formula_wb()[sheet_name].cell(row=row, column=col).value
+            
+            cell_ref = f"{get_column_letter(col)}{row}"
+            if isinstance(formula, str) and formula.startswith('='):
+                self.logger.debug(f"Read calculated value '{formatted_value}' from cell {cell_ref} in sheet {sheet_name} (formula: {formula})")
+            else:
+                self.logger.debug(f"Read value '{formatted_value}' from cell {cell_ref} in sheet {sheet_name}")
         
         return formatted_value
     
@@ -298,9 +706,7 @@ class excelManager:
         - write_cell(sheet_name, 'A1', value) - using cell reference
         - write_cell(sheet_name, 1, 1, value) - using row and column numbers
         """
-        if not self.formula_workbook:
-            self.logger.error("No workbook loaded")
-            raise ValueError("No workbook loaded")
+        self._check_writable()
         
         # Get the row and column based on the input parameters
         if column is None and value is None:
@@ -320,18 +726,21 @@ class excelManager:
             row = row_or_cell
             col = column
         
-        if sheet_name not in self.formula_workbook.sheetnames:
+        formula_workbook = self._get_formula_wb()
+        if sheet_name not in formula_workbook.sheetnames:
             self.logger.error(f"Sheet does not exist: {sheet_name}")
             raise ValueError(f"Sheet does not exist: {sheet_name}")
         
         # Write to the formula workbook
-        formula_sheet = self.formula_workbook[sheet_name]
+        formula_sheet = formula_workbook[sheet_name]
         formula_sheet.cell(row=row, column=col).value = value
+        self._mark_dirty()
         
-        cell_ref = f"{get_column_letter(col)}{row}"
-        self.logger.info(f"Wrote value '{value}' to cell {cell_ref} in sheet {sheet_name}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            cell_ref = f"{get_column_letter(col)}{row}"
+            self.logger.debug(f"Wrote value '{value}' to cell {cell_ref} in sheet {sheet_name}")
     
-    def read_range(self, sheet_name, start_cell_or_row, start_column=None, end_cell_or_row=None, end_column=None):
+    def read_range(self, sheet_name, start_cell_or_row, start_column=None, end_cell_or_row=None, end_column=None, raw=False):
         """
         Read a range of cells.
         
@@ -340,11 +749,11 @@ class excelManager:
         - read_range(sheet_name, 'A1', 'C3') - using start and end cell references
         - read_range(sheet_name, 1, 1, 3, 3) - using row and column numbers
         
-        Returns the calculated values, not the formulas.
+        Returns the calculated values, not the formulas. With raw=True the values are
+        returned unformatted, with None for empty cells; format_for_display() formats
+        them when they are shown.
         """
-        if not self.workbook:
-            self.logger.error("No workbook loaded")
-            raise ValueError("No workbook loaded")
+        self._check_readable()
         
         # Parse the arguments to determine start and end coordinates
         if isinstance(start_cell_or_row, str) and ':' in start_cell_or_row and start_column is None:
@@ -372,22 +781,20 @@ class excelManager:
             self.logger.error(f"Sheet does not exist: {sheet_name}")
             raise ValueError(f"Sheet does not exist: {sheet_name}")
         
-        # Get the calculated values from the data_only workbook
         sheet = self.workbook[sheet_name]
-        values = []
-        for row in range(start_row, end_row + 1):
-            row_values = []
-            for col in range(start_col, end_col + 1):
-                cell_val = sheet.cell(row=row, column=col).value
-                
-                # Check if cell is formatted as currency
-                formula_cell = self.formula_workbook[sheet_name].cell(row=row, column=col)
-                is_currency = formula_cell.number_format and '$' in formula_cell.number_format
-                
-                # Format the value
-                formatted_val = self._format_numeric_value(cell_val, is_currency)
-                row_values.append(formatted_val)
-            values.append(row_values)
+        if raw:
+            # Plain calculated values - no cell objects and no formatting
+            rows = sheet.iter_rows(min_row=start_row, max_row=end_row, min_col=start_col, max_col=end_col, values_only=True)
+            values = [list(row_values) for row_values in rows]
+        else:
+            # Get and format the calculated values from the data_only workbook in a single
+            # streaming pass - each cell carries its own number format for the currency check
+            rows = sheet.iter_rows(min_row=start_row, max_row=end_row, min_col=start_col, max_col=end_col)
+            values = [[self._format_cell(cell) for cell in row_cells] for row_cells in rows]
+        
+        # The read-only reader stops at the last stored row, so pad any rows past it
+        empty_row = [None if raw else ''] * (end_col - start_col + 1)
+        values.extend(list(empty_row) for _ in range(end_row - start_row + 1 - len(values)))
         
         range_ref = f"{get_column_letter(start_col)}{start_row}:{get_column_letter(end_col)}{end_row}"
         self.logger.info(f"Read range {range_ref} in sheet {sheet_name}")
@@ -401,9 +808,7 @@ class excelManager:
         - write_range(sheet_name, 'A1', values) - using cell reference for start
         - write_range(sheet_name, 1, 1, values) - using row and column numbers for start
         """
-        if not self.formula_workbook:
-            self.logger.error("No workbook loaded")
-            raise ValueError("No workbook loaded")
+        self._check_writable()
         
         # Parse the arguments to determine the start coordinate and values
         if isinstance(start_cell_or_row, str) and values_or_end_row is None:
@@ -420,15 +825,23 @@ class excelManager:
             self.logger.error("Invalid arguments for write_range")
             raise ValueError("Invalid arguments for write_range")
         
-        if sheet_name not in self.formula_workbook.sheetnames:
+        formula_workbook = self._get_formula_wb()
+        if sheet_name not in formula_workbook.sheetnames:
             self.logger.error(f"Sheet does not exist: {sheet_name}")
             raise ValueError(f"Sheet does not exist: {sheet_name}")
         
         # Write to the formula workbook
-        formula_sheet = self.formula_workbook[sheet_name]
-        for i, row_values in enumerate(values):
-            for j, value in enumerate(row_values):
-                formula_sheet.cell(row=start_row + i, column=start_col + j).value = value
+        formula_sheet = formula_workbook[sheet_name]
+        if (start_col == 1 and start_row == formula_sheet._current_row + 1
+                and all(isinstance(row_values, (list, tuple)) for row_values in values)):
+            # Rows go directly below the last used row - append them in bulk
+            for row_values in values:
+                formula_sheet.append(row_values)
+        else:
+            for i, row_values in enumerate(values):
+                for j, value in enumerate(row_values):
+                    formula_sheet.cell(row=start_row + i, column=start_col + j).value = value
+        self._mark_dirty()
         
         end_row = start_row + len(values) - 1
         end_col = start_col + len(values[0]) - 1 if values else start_col
@@ -447,9 +860,7 @@ class excelManager:
         
         Returns the calculated total value, typically found at the end of a column of values.
         """
-        if not self.workbook:
-            self.logger.error("No workbook loaded")
-            raise ValueError("No workbook loaded")
+        self._check_readable()
         
         # Get the row and column based on the input parameters
         if column is None:
@@ -469,52 +880,33 @@ class excelManager:
             self.logger.error(f"Sheet does not exist: {sheet_name}")
             raise ValueError(f"Sheet does not exist: {sheet_name}")
         
-        # Get the sheet from the data_only workbook to read calculated values
-        sheet = self.workbook[sheet_name]
-        
-        # Start from the given cell and traverse down
-        current_row = start_row
-        max_rows = sheet.max_row
-        
-        # Keep track of the last non-empty cell value encountered
-        last_value = None
+        # Keep track of the last non-empty cell encountered
+        last_cell = None
         last_row = None
         
-        while current_row <= max_rows:
-            value = sheet.cell(row=current_row, column=start_col).value
+        # Start from the given cell and stream down the column
+        for current_row, cell in self._iter_column(sheet_name, start_row, start_col):
+            value = cell.value
             
             # If we find an empty cell and we've seen at least one non-empty cell, 
             # we'll return the last non-empty cell value (which should be the total)
             if value is None or value == '':
-                if last_value is not None:
-                    # Check if cell is formatted as currency
-                    formula_cell = self.formula_workbook[sheet_name].cell(row=last_row, column=start_col)
-                    is_currency = formula_cell.number_format and '$' in formula_cell.number_format
-                    
-                    # Format the value
-                    formatted_value = self._format_numeric_value(last_value, is_currency)
+                if last_cell is not None:
+                    formatted_value = self._format_cell(last_cell)
                     
                     cell_ref = f"{get_column_letter(start_col)}{last_row}"
                     self.logger.info(f"Found total value '{formatted_value}' at cell {cell_ref} in sheet {sheet_name}")
                     return formatted_value
-                else:
-                    # If we haven't found any non-empty cells, continue searching
-                    current_row += 1
-                    continue
+                # If we haven't found any non-empty cells, continue searching
+                continue
             
-            # Update the last non-empty value seen
-            last_value = value
+            # Update the last non-empty cell seen
+            last_cell = cell
             last_row = current_row
-            current_row += 1
         
         # If we reach the end of the sheet and have a value, return it
-        if last_value is not None:
-            # Check if cell is formatted as currency
-            formula_cell = self.formula_workbook[sheet_name].cell(row=last_row, column=start_col)
-            is_currency = formula_cell.number_format and '$' in formula_cell.number_format
-            
-            # Format the value
-            formatted_value = self._format_numeric_value(last_value, is_currency)
+        if last_cell is not None:
+            formatted_value = self._format_cell(last_cell)
             
             cell_ref = f"{get_column_letter(start_col)}{last_row}"
             self.logger.info(f"Found total value '{formatted_value}' at cell {cell_ref} in sheet {sheet_name} (at end of sheet)")
@@ -524,7 +916,7 @@ class excelManager:
         self.logger.warning(f"No values found starting from {get_column_letter(start_col)}{start_row} in sheet {sheet_name}")
         return None
     
-    def read_items(self, sheet_name, row_or_cell, column=None, offset=0):
+    def read_items(self, sheet_name, row_or_cell, column=None, offset=0, raw=False):
         """
         Read a range of items until an empty cell is found.
         
@@ -537,14 +929,13 @@ class excelManager:
         - row_or_cell: Either a cell reference string (e.g., "A1") or a row number
         - column: Optional column number (required if row_or_cell is a row number)
         - offset: Number of rows to exclude from the end of the found range (default 0)
+        - raw: If True, return the calculated values unformatted (see format_for_display)
         
         Returns:
         - A list of values from the starting cell until an empty cell is found, 
           with optional offset to exclude the last few rows
         """
-        if not self.workbook:
-            self.logger.error("No workbook loaded")
-            raise ValueError("No workbook loaded")
+        self._check_readable()
         
         # Get the row and column based on the input parameters
         if column is None:
@@ -564,32 +955,16 @@ class excelManager:
             self.logger.error(f"Sheet does not exist: {sheet_name}")
             raise ValueError(f"Sheet does not exist: {sheet_name}")
         
-        # Get the sheet from the data_only workbook to read calculated values
-        sheet = self.workbook[sheet_name]
-        
-        # Start from the given cell and traverse down
-        current_row = start_row
-        max_rows = sheet.max_row
-        
         # Store all non-empty values encountered
         items = []
         
-        while current_row <= max_rows:
-            value = sheet.cell(row=current_row, column=start_col).value
-            
+        # Start from the given cell and stream down the column
+        for current_row, cell in self._iter_column(sheet_name, start_row, start_col):
             # If we find an empty cell, break the loop
-            if value is None or value == '':
+            if cell.value is None or cell.value == '':
                 break
             
-            # Check if cell is formatted as currency
-            formula_cell = self.formula_workbook[sheet_name].cell(row=current_row, column=start_col)
-            is_currency = formula_cell.number_format and '$' in formula_cell.number_format
-            
-            # Format the value
-            formatted_value = self._format_numeric_value(value, is_currency)
-            
-            items.append(formatted_value)
-            current_row += 1
+            items.append(cell.value if raw else self._format_cell(cell))
         
         # Apply the offset to exclude the specified number of rows from the end
         if offset != 0 and items:
@@ -622,9 +997,7 @@ class excelManager:
         Returns:
         - The total value from the column with the matching title
         """
-        if not self.workbook:
-            self.logger.error("No workbook loaded")
-            raise ValueError("No workbook loaded")
+        self._check_readable()
         
         # Get the row and column based on the input parameters
         if column is None:
@@ -645,33 +1018,19 @@ class excelManager:
             self.logger.error(f"Sheet does not exist: {sheet_name}")
             raise ValueError(f"Sheet does not exist: {sheet_name}")
         
-        # Get the sheet from the data_only workbook to read calculated values
-        sheet = self.workbook[sheet_name]
-        
-        # Determine the maximum column to search
-        max_col = sheet.max_column
-        
-        # Start from the given cell and traverse right to find the title
-        title_col = None
-        for col in range(start_col, max_col + 1):
-            cell_value = sheet.cell(row=start_row, column=col).value
-            
-            # Check if the cell value matches the title (case-insensitive)
-            if cell_value and isinstance(cell_value, str) and cell_value.lower() == title.lower():
-                title_col = col
-                break
+        # Find the first matching title (case-insensitive) at or right of the given cell
+        title_columns = self._header_columns(sheet_name, start_row).get(title.lower(), [])
+        title_col = next((col for col in title_columns if col >= start_col), None)
         
         if title_col is None:
             self.logger.warning(f"Title '{title}' not found in row {start_row} starting from column {start_col} in sheet {sheet_name}")
             return None
         
         # Once the title column is found, use read_total to get the total value
-        title_cell_ref = f"{get_column_letter(title_col)}{start_row + 1}"  # Start from the cell below the title
-        
         self.logger.info(f"Found title '{title}' at column {get_column_letter(title_col)} in sheet {sheet_name}")
         
-        # Now find the total in this column
-        return self.read_total(sheet_name, title_cell_ref)
+        # Now find the total in this column, starting from the cell below the title
+        return self.read_total(sheet_name, start_row + 1, title_col)
     
     def read_columns(self, sheet_name, input_cells, use_titles=False, start_row=None):
         """
@@ -689,17 +1048,12 @@ class excelManager:
         Returns:
         - A 2D list with the requested columns appended side by side
         """
-        if not self.workbook:
-            self.logger.error("No workbook loaded")
-            raise ValueError("No workbook loaded")
+        self._check_readable()
         
         if sheet_name not in self.workbook.sheetnames:
             self.logger.error(f"Sheet does not exist: {sheet_name}")
             raise ValueError(f"Sheet does not exist: {sheet_name}")
         
-        # Get the sheet from the data_only workbook to read calculated values
-        sheet = self.workbook[sheet_name]
-        
         # Process input_cells as a comma-separated string or a list
         if isinstance(input_cells, str):
             cells_list = [cell.strip() for cell in input_cells.split(',')]
@@ -709,76 +1063,48 @@ class excelManager:
             self.logger.error("input_cells must be a comma-separated string or a list")
             raise ValueError("input_cells must be a comma-separated string or a list")
         
-        # List to store column data
-        columns_data = []
+        # Headers and the (first data row, column) of every requested column
+        column_specs = []
         column_headers = []
         
+        if use_titles:
+            # Every title is looked up in the same header row, so resolve the row and
+            # its {lowercase title: [columns]} map once for the whole call
+            title_row = 1 if start_row is None else start_row  # Default to the first row if not specified
+            header_columns = self._header_columns(sheet_name, title_row)
+        
         # Process each cell or title
         for cell_or_title in cells_list:
             if use_titles:
-                # Find column by title
-                if start_row is None:
-                    title_row = 1  # Default to the first row if not specified
-                else:
-                    title_row = start_row
-                
-                # Find the column with the matching title
-                max_col = sheet.max_column
-                title_col = None
-                
-                for col in range(1, max_col + 1):
-                    cell_value = sheet.cell(row=title_row, column=col).value
-                    
-                    # Check if the cell value matches the title (case-insensitive)
-                    if cell_value and isinstance(cell_value, str) and cell_value.lower() == cell_or_title.lower():
-                        title_col = col
-                        break
+                # Find the first column with the matching title (case-insensitive)
+                title_columns = header_columns.get(cell_or_title.lower())
+                title_col = title_columns[0] if title_columns else None
                 
                 if title_col is None:
                     self.logger.warning(f"Title '{cell_or_title}' not found in row {title_row} in sheet {sheet_name}")
                     continue
                 
                 column_headers.append(cell_or_title)
-                # Start reading from the row below the title
-                start_cell_ref = f"{get_column_letter(title_col)}{title_row + 1}"
-                
-                # Read items from this column
-                items = self.read_items(sheet_name, start_cell_ref)
-                columns_data.append(items)
+                # Items start from the row below the title
+                column_specs.append((title_row + 1, title_col))
                 
             else:
                 # Process as cell reference
                 sheet_ref, row, col = self._parse_cell_reference(cell_or_title, sheet_name)
                 
                 # Get the column header value (from the specified cell)
-                header_value = sheet.cell(row=row, column=col).value
-                column_headers.append(header_value)
-                
-                # Read items from this column, starting from the cell below
-                start_cell_ref = f"{get_column_letter(col)}{row + 1}"
+                column_headers.append(self._get_cell(sheet_name, row, col).value)
                 
-                # Read items from this column
-                items = self.read_items(sheet_name, start_cell_ref)
-                columns_data.append(items)
+                # Items start from the cell below
+                column_specs.append((row + 1, col))
         
-        # Determine the maximum length of all columns
-        max_length = max([len(col) for col in columns_data]) if columns_data else 0
+        # Read the items of every column in a single pass over the sheet
+        columns_data = self._read_column_items(sheet_name, column_specs)
         
-        # Make all columns the same length by padding with empty strings
-        padded_columns = []
-        for col in columns_data:
-            padded_col = col + [''] * (max_length - len(col))
-            padded_columns.append(padded_col)
-        
-        # Add headers as the first row
+        # Add headers as the first row, then transpose the columns into rows,
+        # padding the shorter columns with empty strings
         result = [column_headers]
-        
-        # Transpose the data to have rows instead of columns
-        for i in range(max_length):
-            row_data = []
-            for col in padded_columns:
-                row_data.append(col[i] if i < len(col) else '')
-            result.append(row_data)
+        result.extend(list(row) for row in itertools.zip_longest(*columns_data, fillvalue=''))
         
         if use_titles:
             log_message = f"Read {len(columns_data)} columns by titles: {', '.join(cells_list)} in sheet {sheet_name}"
@@ -1,4 +1,8 @@
 # keyword_parser.py
+import copy
+import functools
+import hashlib
+import operator
 import re
 import json
 import os
@@ -8,7 +12,212 @@ from excel_manager import excelManager
 from docx.shared import Pt, Cm
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml import parse_xml
-from docx.oxml.ns import nsdecls
+from docx.oxml.ns import nsdecls, qn
+
+try:
+    import orjson
+except ImportError:  # Optional faster JSON parser
+    orjson = None
+
+# Keyword pattern compiled once, parse() runs it on every string it is given.
+# Call the compiled pattern's methods (_KEYWORD_RE.finditer(s)) rather than
+# re.finditer(_KEYWORD_RE, s), which goes through the re module's cache lookup first.
+_KEYWORD_RE = re.compile(r'{{(.*?)}}')
+
+# Template files are cached by path and modification time, so an edited file is read again
+@functools.lru_cache(maxsize=128)
+def _read_template(path, mtime_ns):
+    with open(path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+@functools.lru_cache(maxsize=128)
+def _template_lines(path, mtime_ns):
+    return tuple(_read_template(path, mtime_ns).splitlines())
+
+# orjson turns integers outside the 64-bit range into floats instead of failing, and
+# every such integer has at least 19 digits - leave those documents to json
+_LONG_DIGITS_RE = re.compile(rb'\d{19}')
+
+# JSON files are cached the same way - the parsed data is shared, so it must not be modified
+@functools.lru_cache(maxsize=32)
+def _load_json(path, mtime_ns):
+    with open(path, 'rb') as file:
+        data = file.read()
+    if orjson is not None and not _LONG_DIGITS_RE.search(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass # json also accepts NaN/Infinity
+    return json.loads(data.decode('utf-8'))
+
+# Text that float() accepts (sign, digits with optional '_' groups, decimals, exponent, nan/inf)
+_NUMERIC_RE = re.compile(
+    r'\s*[-+]?(?:(?:\d(?:_?\d)*)(?:\.(?:\d(?:_?\d)*)?)?|\.\d(?:_?\d)*)(?:[eE][-+]?\d(?:_?\d)*)?\s*'
+    r'|\s*[-+]?(?i:nan|inf|infinity)\s*'
+)
+
+# Removes currency symbols and thousands separators in one pass
+_NUMBER_SYMBOLS = str.maketrans('', '', '$,')
+
+def _is_numeric(value):
+    """
+    Check if a table value is numeric, including text like '$1,234.50'.
+    Matches what float() accepts after removing '$' and ',' without raising on text cells.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return True
+    return _NUMERIC_RE.fullmatch(str(value).translate(_NUMBER_SYMBOLS)) is not None
+
+# INPUT date formats -> strftime/strptime format
+_DATE_FORMATS = {
+    "YYYY/MM/DD": "%Y/%m/%d",
+    "DD/MM/YYYY": "%d/%m/%Y",
+    "MM/DD/YYYY": "%m/%d/%Y",
+}
+
+# Session state key of the set of input field keys created by keyword parsers
+_INPUT_FIELD_KEYS = "keyword_parser_input_field_keys"
+
+# Value an input field is reset to, by the type of its current value - text/area/select/date reset to ""
+_INPUT_FIELD_DEFAULTS = {
+    bool: False,  # Checkbox
+    int: 0,  # Number (if ever used)
+    float: 0,
+}
+
+# Word table cell shading, parsed once and copied into each cell
+_HEADER_SHADING = parse_xml(f'<w:shd {nsdecls("w")} w:fill="D9D9D9"/>')  # Light gray
+_ALT_ROW_SHADING = parse_xml(f'<w:shd {nsdecls("w")} w:fill="F5F5F5"/>')  # Very light gray
+
+# Word table cell paragraphs (spacing, alignment, 10pt run) for text without tabs or
+# line breaks - copied into each cell instead of going through Paragraph/Run objects
+def _cell_paragraph(alignment, bold=False):
+    return parse_xml(
+        f'<w:p {nsdecls("w")}><w:pPr><w:spacing w:before="60" w:after="60"/><w:jc w:val="{alignment}"/></w:pPr>'
+        f'<w:r><w:rPr>{"<w:b/>" if bold else ""}<w:sz w:val="20"/></w:rPr><w:t/></w:r></w:p>'
+    )
+
+_HEADER_CELL_PARAGRAPH = _cell_paragraph("center", bold=True)
+_LEFT_CELL_PARAGRAPH = _cell_paragraph("left")
+_RIGHT_CELL_PARAGRAPH = _cell_paragraph("right")
+_RUN_BREAKS_RE = re.compile(r'[\t\n\r]')  # Text python-docx turns into <w:tab/> and <w:br/>
+
+# Parameters of a file TEMPLATE keyword, matched by their prefix
+_TEMPLATE_PARAM_RE = re.compile(r'section=|line=|paragraph=|VARS\(')
+
+# JSON transformations - SUM, JOIN(delimiter) or BOOL(YesText/NoText)
+_JSON_TRANSFORM_RE = re.compile(r'(?P<name>SUM)|(?P<func>JOIN|BOOL)\((?P<args>.*)\)', re.DOTALL)
+
+# Values the BOOL transformation treats as true, by JSON value type
+_JSON_TRUE_STRINGS = frozenset(['true', 'yes', '1', 'on'])
+_JSON_BOOL_CONVERTERS = {
+    bool: bool,
+    int: bool,  # Non-zero numbers are true
+    float: bool,
+    str: lambda text: text.lower() in _JSON_TRUE_STRINGS,
+}
+
+# Placeholder pattern for a set of TEMPLATE VARS names, e.g. {name} or {date}
+@functools.lru_cache(maxsize=128)
+def _template_vars_re(keys):
+    return re.compile(r'\{(' + '|'.join(map(re.escape, keys)) + r')\}')
+
+def _is_keyword_ref(text):
+    """Check if a JSON filename or path part is itself a {{keyword}}."""
+    return len(text) >= 4 and text[:2] == "{{" and text[-2:] == "}}"
+
+# JSON paths are parsed once into steps, then walked against each file's data:
+#   ("key", name), ("ref", keyword), ("array", name), ("index", n), ("wild", None), ("bad_index", text)
+@functools.lru_cache(maxsize=512)
+def _compile_jsonpath(json_path):
+    """
+    Split a '$.a.b[0].c' path into its steps.
+    Keyword parts ({{...}}) stay as "ref" steps - their value is looked up on every walk.
+    """
+    steps = []
+    for part in json_path[2:].split("."):
+        # Array indexing like array[0] or [*]
+        if "[" in part and part.endswith("]"):
+            key = part.split("[")[0]
+            index_str = part.split("[")[1][:-1]
+            if key:
+                steps.append(("array", key))
+            if index_str == "*":
+                steps.append(("wild", None))
+            else:
+                try:
+                    steps.append(("index", int(index_str)))
+                except ValueError:
+                    steps.append(("bad_index", index_str))
+        # Dynamic property names using keywords
+        elif _is_keyword_ref(part):
+            steps.append(("ref", part))
+        else:
+            steps.append(("key", part))
+    return tuple(steps)
+
+@functools.lru_cache(maxsize=512)
+def _simple_jsonpath(json_path):
+    """Return the keys of a path made only of plain keys ('$.a.b.c'), or None for any other path."""
+    steps = _compile_jsonpath(json_path)
+    if all(step == "key" for step, _ in steps):
+        return tuple(key for _, key in steps)
+    return None
+
+# Help text shown by get_keyword_help()
+_KEYWORD_HELP_TEXT = """
+        ## Keyword System Help (using '!' separator)
+
+        ### Excel Data Keywords (`{{XL!...}}`)
+        Keywords to fetch data from an Excel file.
+
+        * **`{{XL!CELL!cell_ref}}`**: Get value from a single cell.
+            * Example: `{{XL!CELL!A1}}`
+            * Example with sheet: `{{XL!CELL!SheetName!B5}}`
+        * **`{{XL!LAST!cell_ref}}`**: Get the last non-empty value going down from `cell_ref`.
+            * Example: `{{XL!LAST!A1}}`
+            * Example with sheet: `{{XL!LAST!SheetName!B5}}`
+        * **`{{XL!LAST!sheet_name!cell_ref!Title}}`**: Find column by `Title` in the row of `cell_ref`, then get the last non-empty value below `Title`.
+            * Example: `{{XL!LAST!Items!A4!Total Project Costs}}`
+        * **`{{XL!RANGE!range_ref}}`**: Get values from a range (e.g., `A1:C5` or `NamedRange`). Returns a formatted table.
+            * Example: `{{XL!RANGE!A1:C5}}`
+            * Example with sheet: `{{XL!RANGE!SheetName!A1:C5}}`
+            * Example with named range: `{{XL!RANGE!MyNamedRange}}`
+        * **`{{XL!COLUMN!sheet_name!col_refs}}`**: Get specified columns starting from `col_refs` (e.g., "A1,C1,E1"). Returns a table.
+            * Example: `{{XL!COLUMN!Items!A4,E4,F4}}`
+        * **`{{XL!COLUMN!sheet_name!"Titles"!start_row}}`**: Get columns by `Titles` (e.g., "Revenue,Expense,Profit") found in `start_row`. Returns a table.
+            * Example: `{{XL!COLUMN!Items!"Activities,HST,Total Project Costs"!4}}` (Finds titles in row 4)
+
+        ### User Input Keywords (`{{INPUT!...}}`)
+        Keywords to create interactive input fields.
+
+        * **`{{INPUT!text!label!default_value}}`**: Single-line text input.
+        * **`{{INPUT!area!label!default_value!height}}`**: Multi-line text area (optional height in pixels).
+        * **`{{INPUT!date!label!default_date!format}}`**: Date picker (`default_date` can be 'today' or 'YYYY/MM/DD'). `format` is optional (e.g., 'YYYY/MM/DD', 'DD/MM/YYYY').
+        * **`{{INPUT!select!label!option1,option2,...}}`**: Dropdown selection.
+        * **`{{INPUT!check!label!default_state}}`**: Checkbox (`default_state` is 'True' or 'False').
+
+        ### Template Keywords (`{{TEMPLATE!...}}`)
+        Keywords to include content from other files or libraries.
+
+        * **`{{TEMPLATE!filename.docx}}`**: Include entire external template file.
+        * **`{{TEMPLATE!filename.docx!section=name}}`**: Include specific section/bookmark.
+        * **`{{TEMPLATE!filename.txt!line=5}}`**: Include specific line number from text file.
+        * **`{{TEMPLATE!filename.docx!paragraph=3}}`**: Include specific paragraph number.
+        * **`{{TEMPLATE!filename.docx!VARS(key1=val1,key2=val2)}}`**: Template with variable substitution (values can be keywords).
+        * **`{{TEMPLATE!LIBRARY!template_name!version}}`**: Reference template from a predefined library (optional version).
+
+        ### JSON Data Keywords (`{{JSON!...}}`)
+        Keywords to fetch data from JSON files using JSONPath.
+
+        * **`{{JSON!filename.json!json_path}}`**: Access data using JSONPath (e.g., `$.key`, `$.array[0].name`).
+            * Example: `{{JSON!config.json!$.settings.theme}}`
+            * Example: `{{JSON!data.json!$.users[1].email}}`
+        * **`{{JSON!filename.json!json_path!TRANSFORMATION}}`**: Apply optional transformation.
+            * `SUM`: Sum numeric values in an array. (`{{JSON!data.json!$.values!SUM}}`)
+            * `JOIN(delimiter)`: Join array items with a delimiter. (`{{JSON!data.json!$.names!JOIN(,)}}`)
+            * `BOOL(YesText/NoText)`: Transform boolean to custom text. (`{{JSON!config.json!$.enabled!BOOL(Active/Inactive)}}`)
+        """
 
 class keywordParser:
     """
@@ -25,15 +234,21 @@ class keywordParser:
                            If None, a new instance will be created when needed.
         """
         self.excel_manager = excel_manager
-        self.pattern = r'{{(.*?)}}'
+        self.pattern = _KEYWORD_RE.pattern  # Pattern text only - match with _KEYWORD_RE
         self.has_input_fields = False
         self.form_submitted = False
         self.word_document = None
         self.input_values = {}  # Store input values
+        self.keyword_cache = {}  # Values of keywords already processed for the current Word document or parse() call
+        self._table_data_cache = {}  # Excel range/column reads, kept as long as keyword_cache
+        self._sheet_names_cache = None  # Sheet names of the workbook, read once per parse() call
+        self._sheet_map_cache = None  # Case-folded sheet name -> actual sheet name
 
     def set_word_document(self, doc):
         """Set the word document for direct table insertion."""
         self.word_document = doc
+        self.keyword_cache = {}  # A new document starts with fresh keyword values
+        self._table_data_cache = {}
 
     def parse(self, input_string):
         """
@@ -48,28 +263,40 @@ class keywordParser:
         if not input_string:
             return input_string
 
-        # Find all keywords in the input string
-        matches = list(re.finditer(self.pattern, input_string))
-
-        # First handle all INPUT keywords
-        input_keywords = []
-        for match in matches:
-            content = match.group(1)  # Content inside {{}}
-            keyword = match.group(0)  # The full {{keyword}}
-            parts = content.split("!", 1) # Use '!' as separator
-            keyword_type = parts[0].strip().upper()
-
-            if keyword_type == "INPUT":
-                input_keywords.append((keyword, content))
+        # Most text has no keywords at all - skip the regex work for it
+        if "{{" not in input_string:
+            return input_string
 
-        # If we have input fields, process them first using a form
-        if input_keywords and not self.form_submitted:
-            with st.form(key=f"input_form_{id(input_string)}"):
+        # Sheets may have changed since the last call, look them up again when needed
+        self._sheet_names_cache = None
+        # Outside a Word document, keyword values are only reused within this call
+        if self.word_document is None:
+            self.keyword_cache = {}
+            self._table_data_cache = {}
+
+        # First handle all INPUT keywords - each distinct keyword is prompted for once.
+        # Once the form has been submitted no form is shown, so there is nothing to collect.
+        input_keywords = {}
+        if not self.form_submitted:
+            for match in _KEYWORD_RE.finditer(input_string):
+                content = match.group(1)  # Content inside {{}}
+                keyword = match.group(0)  # The full {{keyword}}
+                # Only the type is needed here - the INPUT field splits the content itself
+                keyword_type = content.partition("!")[0].strip().upper() # Use '!' as separator
+
+                if keyword_type == "INPUT" and keyword not in self.input_values:
+                    input_keywords.setdefault(keyword, content)
+
+        # If we have input fields without a value yet, process them first using a form
+        if input_keywords:
+            # Key the form by the text's content so it stays the same across reruns
+            form_key = hashlib.blake2b(input_string.encode('utf-8'), digest_size=8).hexdigest()
+            with st.form(key=f"input_form_{form_key}"):
                 st.subheader("Please provide input values:")
 
                 # Create input fields and store their values
                 temp_input_values = {}
-                for keyword, content in input_keywords:
+                for keyword, content in input_keywords.items():
                     value = self._create_input_field(content)
                     temp_input_values[keyword] = value
 
@@ -84,24 +311,41 @@ class keywordParser:
                     st.stop()
 
 
-        # After processing inputs or if no inputs, process all keywords
-        result = input_string
-        for match in matches:
+        # After processing inputs or if no inputs, replace all keywords in a single
+        # pass over the string; replacement text is never rescanned for keywords.
+        def replace_keyword(match):
             keyword = match.group(0)  # Full keyword with {{}}
             content = match.group(1)  # Content inside {{}}
 
             # If this is an INPUT keyword we've already processed
             if keyword in self.input_values:
                 replacement = self.input_values[keyword]
+            elif content in self.keyword_cache:
+                # Repeated keyword - reuse its value
+                replacement = self.keyword_cache[content]
             else:
                 replacement = self._process_keyword(content)
+                # Inserted tables must be inserted each time
+                if replacement != "[TABLE_INSERTED]":
+                    self.keyword_cache[content] = replacement
 
-            # Replace the keyword with its value
             # Ensure replacement is string, handle potential None values
-            result = result.replace(keyword, str(replacement) if replacement is not None else "", 1)
+            return str(replacement) if replacement is not None else ""
 
+        return _KEYWORD_RE.sub(replace_keyword, input_string)
 
-        return result
+    def _parse_keyword_ref(self, text):
+        """
+        Return the value of a {{keyword}} used as a JSON filename or key.
+        A single keyword is processed directly instead of going through a full parse() of the text.
+        """
+        content = text[2:-2]
+        if "}}" in content:
+            return self.parse(text) # More than one keyword
+
+        # Entered INPUT values are used as in parse()
+        value = self.input_values[text] if text in self.input_values else self._process_keyword(content)
+        return str(value) if value is not None else ""
 
     def _create_input_field(self, content):
         """
@@ -129,126 +373,129 @@ class keywordParser:
         if keyword_type != "INPUT":
             return "[Invalid INPUT keyword]"
 
-        # Handle text input - {{INPUT!text!label!value}}
-        if input_type == "text":
-            label = tokens[2] if len(tokens) > 2 else ""
-            default_value = tokens[3] if len(tokens) > 3 else ""
-            return st.text_input(
+        handler = self._input_field_handlers.get(input_type)
+        if handler is None:
+            # Default for unrecognized input types
+            return f"[Unsupported input type: {input_type}]"
+        return handler(self, tokens, content)
+
+    def _input_field_key(self, content):
+        """Return the session state key of an INPUT field and remember it for clear_input_cache()."""
+        key = f"input_field_{content}"
+        # Kept in session state, as the apps may create a new parser on every rerun
+        st.session_state.setdefault(_INPUT_FIELD_KEYS, set()).add(key)
+        return key
+
+    def _input_text(self, tokens, content):
+        """Handle text input - {{INPUT!text!label!value}}"""
+        label = tokens[2] if len(tokens) > 2 else ""
+        default_value = tokens[3] if len(tokens) > 3 else ""
+        return st.text_input(
+            label=label,
+            value=default_value,
+            label_visibility="visible",
+            key=self._input_field_key(content) # Unique key
+        )
+
+    def _input_area(self, tokens, content):
+        """Handle text area - {{INPUT!area!label!value!height}}"""
+        label = tokens[2] if len(tokens) > 2 else ""
+        default_value = tokens[3] if len(tokens) > 3 else ""
+        height_px = tokens[4] if len(tokens) > 4 else None
+
+        # Convert height to integer if provided
+        height = None
+        if height_px:
+            try:
+                height = int(height_px)
+            except ValueError:
+                # If height is not a valid integer, ignore it
+                pass
+
+        # Set height if provided, otherwise use default
+        if height:
+            return st.text_area(
                 label=label,
                 value=default_value,
+                height=height,
                 label_visibility="visible",
-                key=f"input_field_{content}" # Unique key
+                key=self._input_field_key(content) # Unique key
             )
-
-        # Handle text area - {{INPUT!area!label!value!height}}
-        elif input_type == "area":
-            label = tokens[2] if len(tokens) > 2 else ""
-            default_value = tokens[3] if len(tokens) > 3 else ""
-            height_px = tokens[4] if len(tokens) > 4 else None
-
-            # Convert height to integer if provided
-            height = None
-            if height_px:
-                try:
-                    height = int(height_px)
-                except ValueError:
-                    # If height is not a valid integer, ignore it
-                    pass
-
-            # Set height if provided, otherwise use default
-            if height:
-                return st.text_area(
-                    label=label,
-                    value=default_value,
-                    height=height,
-                    label_visibility="visible",
-                     key=f"input_field_{content}" # Unique key
-                )
-            else:
-                return st.text_area(
-                    label=label,
-                    value=default_value,
-                    label_visibility="visible",
-                     key=f"input_field_{content}" # Unique key
-                )
-
-        # Handle date input - {{INPUT!date!label!value!format}}
-        elif input_type == "date":
-            label = tokens[2] if len(tokens) > 2 else ""
-            default_value_str = tokens[3] if len(tokens) > 3 else "today"
-            date_format = tokens[4] if len(tokens) > 4 else "YYYY/MM/DD"
-
-            # Handle "today" default value
-            if default_value_str.lower() == "today":
-                default_date = date.today()
-            else:
-                try:
-                    # Try to parse the date based on the format
-                    if date_format == "YYYY/MM/DD":
-                        default_date = datetime.strptime(default_value_str, "%Y/%m/%d").date()
-                    elif date_format == "DD/MM/YYYY":
-                        default_date = datetime.strptime(default_value_str, "%d/%m/%Y").date()
-                    elif date_format == "MM/DD/YYYY":
-                        default_date = datetime.strptime(default_value_str, "%m/%d/%Y").date()
-                    else:
-                        # Default to ISO format if format is not recognized
-                        default_date = datetime.strptime(default_value_str, "%Y-%m-%d").date()
-                except ValueError:
-                    default_date = date.today()
-
-            date_value = st.date_input(
-                label=label,
-                value=default_date,
-                label_visibility="visible",
-                 key=f"input_field_{content}" # Unique key
-            )
-
-            # Return the date in the requested format
-            if date_format == "YYYY/MM/DD":
-                return date_value.strftime("%Y/%m/%d")
-            elif date_format == "DD/MM/YYYY":
-                return date_value.strftime("%d/%m/%Y")
-            elif date_format == "MM/DD/YYYY":
-                return date_value.strftime("%m/%d/%Y")
-            else:
-                return date_value.strftime("%Y/%m/%d")  # Default format
-
-        # Handle select box - {{INPUT!select!label!options}}
-        elif input_type == "select":
-            label = tokens[2] if len(tokens) > 2 else ""
-            options_str = tokens[3] if len(tokens) > 3 else ""
-
-            # Parse options (comma-separated)
-            options = [opt.strip() for opt in options_str.split(",")] if options_str else []
-
-            if not options:
-                return "[No options provided]"
-
-            return st.selectbox(
-                label=label,
-                options=options,
-                label_visibility="visible",
-                 key=f"input_field_{content}" # Unique key
-            )
-
-        # Handle checkbox - {{INPUT!check!label!value}}
-        elif input_type == "check":
-            label = tokens[2] if len(tokens) > 2 else ""
-            default_value_str = tokens[3].lower() if len(tokens) > 3 else "false"
-
-            # Convert string value to boolean
-            default_value = default_value_str == "true"
-
-            return st.checkbox(
+        else:
+            return st.text_area(
                 label=label,
                 value=default_value,
                 label_visibility="visible",
-                 key=f"input_field_{content}" # Unique key
+                key=self._input_field_key(content) # Unique key
             )
 
-        # Default for unrecognized input types
+    def _input_date(self, tokens, content):
+        """Handle date input - {{INPUT!date!label!value!format}}"""
+        label = tokens[2] if len(tokens) > 2 else ""
+        default_value_str = tokens[3] if len(tokens) > 3 else "today"
+        date_format = tokens[4] if len(tokens) > 4 else "YYYY/MM/DD"
+
+        # Handle "today" default value
+        if default_value_str.lower() == "today":
+            default_date = date.today()
         else:
-            return f"[Unsupported input type: {input_type}]"
+            try:
+                # Parse the date based on the format, ISO format if it is not recognized
+                default_date = datetime.strptime(default_value_str, _DATE_FORMATS.get(date_format, "%Y-%m-%d")).date()
+            except ValueError:
+                default_date = date.today()
+
+        date_value = st.date_input(
+            label=label,
+            value=default_date,
+            label_visibility="visible",
+            key=self._input_field_key(content) # Unique key
+        )
+
+        # Return the date in the requested format (YYYY/MM/DD by default)
+        return date_value.strftime(_DATE_FORMATS.get(date_format, "%Y/%m/%d"))
+
+    def _input_select(self, tokens, content):
+        """Handle select box - {{INPUT!select!label!options}}"""
+        label = tokens[2] if len(tokens) > 2 else ""
+        options_str = tokens[3] if len(tokens) > 3 else ""
+
+        # Parse options (comma-separated)
+        options = [opt.strip() for opt in options_str.split(",")] if options_str else []
+
+        if not options:
+            return "[No options provided]"
+
+        return st.selectbox(
+            label=label,
+            options=options,
+            label_visibility="visible",
+            key=self._input_field_key(content) # Unique key
+        )
+
+    def _input_check(self, tokens, content):
+        """Handle checkbox - {{INPUT!check!label!value}}"""
+        label = tokens[2] if len(tokens) > 2 else ""
+        default_value_str = tokens[3].lower() if len(tokens) > 3 else "false"
+
+        # Convert string value to boolean
+        default_value = default_value_str == "true"
+
+        return st.checkbox(
+            label=label,
+            value=default_value,
+            label_visibility="visible",
+            key=self._input_field_key(content) # Unique key
+        )
+
+    # INPUT field type -> handler
+    _input_field_handlers = {
+        "text": _input_text,
+        "area": _input_area,
+        "date": _input_date,
+        "select": _input_select,
+        "check": _input_check,
+    }
 
     def _process_keyword(self, content):
         """
@@ -260,43 +507,29 @@ class keywordParser:
         Returns:
             The processed value of the keyword.
         """
-        parts = content.split("!", 1) # Use '!' as separator
-        keyword_type = parts[0].strip().upper()
+        # Use '!' as separator - the type and the rest without building a list
+        keyword_type, _, params = content.partition("!")
+        keyword_type = keyword_type.strip().upper()
 
-        # Process Excel data keywords
-        if keyword_type == "XL":
-            return self._process_excel_keyword(parts[1] if len(parts) > 1 else "")
-
-        # Process user input keywords - these should already be handled in parse()
-        elif keyword_type == "INPUT":
-            # Fallback if not handled by the form (e.g., in tester_app without form)
-             params = parts[1] if len(parts) > 1 else ""
-             return self._process_input_keyword(params)
-
-
-        # Process template keywords
-        elif keyword_type == "TEMPLATE":
-            return self._process_template_keyword(parts[1] if len(parts) > 1 else "")
-
-        # Process JSON keywords
-        elif keyword_type == "JSON":
-            return self._process_json_keyword(parts[1] if len(parts) > 1 else "")
+        handler = self._keyword_handlers.get(keyword_type)
 
         # Unknown keyword type
-        else:
+        if handler is None:
             # If no known keyword type, treat it as a potential named range for XL
              return self._process_excel_keyword(f"RANGE!{content}")
             # return f"[Unknown keyword type: {keyword_type}]"
 
+        return handler(self, params)
+
     def _process_input_keyword(self, params):
         """Process INPUT keywords directly if needed (fallback). Uses '!' separator."""
-        input_parts = params.split("!") # Use '!' separator
-        input_type = input_parts[0].lower() if input_parts else ""
+        # Use '!' separator - only the type and the value after the label are needed
+        input_type, _, rest = params.partition("!")
+        input_type = input_type.lower()
+        value = rest.partition("!")[2].partition("!")[0] # Skip the label
 
         if input_type == "text" or input_type == "area":
-            label = input_parts[1] if len(input_parts) > 1 else ""
-            default_value = input_parts[2] if len(input_parts) > 2 else ""
-            return default_value
+            return value
 
         elif input_type == "date":
             # Use already imported datetime modules correctly
@@ -304,13 +537,11 @@ class keywordParser:
             return today.strftime("%Y/%m/%d")
 
         elif input_type == "select":
-            options_str = input_parts[2] if len(input_parts) > 2 else ""
-            options = [opt.strip() for opt in options_str.split(",")] if options_str else []
+            options = [opt.strip() for opt in value.split(",")] if value else []
             return options[0] if options else ""
 
         elif input_type == "check":
-            default_value_str = input_parts[2].lower() if len(input_parts) > 2 else "false"
-            return default_value_str == "true"
+            return value.lower() == "true"
 
         else:
             return params if params else "[Input value]"
@@ -323,8 +554,9 @@ class keywordParser:
         if not self.excel_manager:
             return "[Excel manager not initialized]"
 
-        parts = content.split("!") # Use '!' as separator
-        if len(parts) < 2:
+        # Use '!' as separator - the type and its parameters
+        xl_type, has_params, xl_params = content.partition("!")
+        if not has_params:
              # Attempt to handle old format or named range as RANGE
             if ':' in content: # Could be old range XL:Sheet!A1:B2 or XL:A1:B2
                  if '!' in content.split(':')[0]: # Old range with sheet XL:Sheet!A1:B2
@@ -347,16 +579,19 @@ class keywordParser:
             # return f"[Invalid XL format: {content}]"
 
 
-        xl_type = parts[0].strip().upper()
-        xl_params = "!".join(parts[1:]) # Rejoin remaining parts
+        return self._call_excel_method(xl_type.strip().upper(), xl_params)
 
-        return self._call_excel_method(xl_type, xl_params)
 
+    def _get_sheet_map(self):
+        """Return the workbook's sheet names and a case-insensitive name lookup, cached for the current parse() call."""
+        if self._sheet_names_cache is None:
+            self._sheet_names_cache = self.excel_manager.get_sheet_names()
+            self._sheet_map_cache = {sheet.casefold(): sheet for sheet in self._sheet_names_cache}
+        return self._sheet_names_cache, self._sheet_map_cache
 
     def _call_excel_method(self, xl_type, xl_params):
         """Helper function to call the appropriate excelManager method."""
-        available_sheets = self.excel_manager.get_sheet_names()
-        sheet_name_map = {sheet.lower(): sheet for sheet in available_sheets}
+        available_sheets, sheet_name_map = self._get_sheet_map()
 
         try:
             # {{XL!CELL!A1}} or {{XL!CELL!Sheet2!B5}}
@@ -367,12 +602,11 @@ class keywordParser:
             # {{XL!LAST!A1}} or {{XL!LAST!Sheet2!B5}}
             # {{XL!LAST!sheet_name!A1!Title}}
             elif xl_type == "LAST":
-                last_parts = xl_params.split("!")
-                if len(last_parts) >= 3: # Title format: {{XL!LAST!sheet_name!A1!Title}}
-                    sheet_name_ref = last_parts[0]
-                    cell_ref = last_parts[1]
-                    title = last_parts[2]
-                    actual_sheet_name = sheet_name_map.get(sheet_name_ref.lower(), sheet_name_ref) # Allow direct sheet name or lookup
+                sheet_name_ref, _, last_rest = xl_params.partition("!")
+                cell_ref, has_title, title = last_rest.partition("!")
+                if has_title: # Title format: {{XL!LAST!sheet_name!A1!Title}}
+                    title = title.partition("!")[0]
+                    actual_sheet_name = sheet_name_map.get(sheet_name_ref.casefold(), sheet_name_ref) # Allow direct sheet name or lookup
                     if actual_sheet_name not in available_sheets: return f"[Sheet not found: {actual_sheet_name}]"
                     return self.excel_manager.read_title_total(actual_sheet_name, cell_ref, title)
                 else: # Basic LAST format: {{XL!LAST!A1}} or {{XL!LAST!Sheet2!B5}}
@@ -389,7 +623,7 @@ class keywordParser:
                      # For now, assume read_range might handle named ranges or error out.
                     pass # Continue to read_range
 
-                data = self.excel_manager.read_range(sheet_name, range_ref)
+                data = self._read_table_data(self.excel_manager.read_range, sheet_name, range_ref)
                 if self.word_document and data:
                     return self._create_word_table(data)
                 else:
@@ -403,7 +637,7 @@ class keywordParser:
                 sheet_ref = col_parts[0]
                 columns_input = col_parts[1].strip('"') # Cell refs or titles
 
-                actual_sheet_name = sheet_name_map.get(sheet_ref.lower(), sheet_ref) # Allow direct sheet name or lookup
+                actual_sheet_name = sheet_name_map.get(sheet_ref.casefold(), sheet_ref) # Allow direct sheet name or lookup
                 if actual_sheet_name not in available_sheets: return f"[Sheet not found: {actual_sheet_name}]"
 
                 start_row = None
@@ -424,7 +658,7 @@ class keywordParser:
                     # else: use_titles = False (default)
 
 
-                data = self.excel_manager.read_columns(actual_sheet_name, columns_input, use_titles=use_titles, start_row=start_row)
+                data = self._read_table_data(self.excel_manager.read_columns, actual_sheet_name, columns_input, use_titles, start_row)
 
                 if self.word_document and data:
                     return self._create_word_table(data)
@@ -439,13 +673,23 @@ class keywordParser:
             self.excel_manager.logger.error(f"Error processing XL keyword '{content}': {str(e)}", exc_info=True)
             return f"[Error processing XL: {str(e)}]"
 
+    def _read_table_data(self, read, *args):
+        """
+        Call an excelManager read method, reusing its data when the same range or columns were read before.
+        Inserted Word tables are never taken from keyword_cache, so repeated tables share the read here.
+        """
+        key = (read.__name__, *args)
+        if key not in self._table_data_cache:
+            self._table_data_cache[key] = read(*args)
+        return self._table_data_cache[key]
+
     def _get_sheet_and_ref(self, params, default_sheet, sheet_map):
         """Helper to extract sheet name and cell/range reference."""
-        parts = params.split("!")
-        if len(parts) > 1 and parts[0].strip("'").lower() in sheet_map:
+        sheet_ref, has_sheet, reference = params.partition("!") # Reference keeps any further '!'
+        sheet_key = sheet_ref.strip("'").casefold()
+        if has_sheet and sheet_key in sheet_map:
             # Sheet name is explicitly provided
-            sheet_name = sheet_map[parts[0].strip("'").lower()]
-            reference = "!".join(parts[1:]) # Rejoin if ref itself contains '!'
+            sheet_name = sheet_map[sheet_key]
         else:
             # Use default sheet
             sheet_name = default_sheet
@@ -463,32 +707,24 @@ class keywordParser:
         if not data or not isinstance(data, list) or not all(isinstance(row, list) for row in data):
              return str(data) # Return raw data if not a list of lists
 
-        # Calculate column widths
-        col_widths = [0] * (max(len(row) for row in data) if data else 0)
-        for row in data:
-            for i, cell in enumerate(row):
-                cell_str = str(cell) if cell is not None else ""
-                if i < len(col_widths):
-                     col_widths[i] = max(col_widths[i], len(cell_str))
-
+        # Convert each cell to text once, then calculate column widths
+        str_rows = [["" if cell is None else str(cell) for cell in row] for row in data]
+        col_widths = [0] * max(map(len, str_rows))
+        for row in str_rows:
+            for i, cell_str in enumerate(row):
+                if len(cell_str) > col_widths[i]:
+                    col_widths[i] = len(cell_str)
 
         # Create the table as a string
         result = []
-        for row_index, row in enumerate(data):
+        for row_index, row in enumerate(str_rows):
             row_str = []
-            for i, cell in enumerate(row):
-                 cell_str = str(cell) if cell is not None else ""
-                 # Basic alignment (numbers right, text left) - simplistic check
-                 try:
-                      # Attempt to convert to float, fails for non-numeric strings
-                      float(cell_str.replace(',', '').replace('$', ''))
-                      formatted = cell_str.rjust(col_widths[i])
-                 except (ValueError, TypeError):
-                      formatted = cell_str.ljust(col_widths[i])
-
-                 if i < len(col_widths):
-                     row_str.append(formatted)
-
+            for i, cell_str in enumerate(row):
+                 # Basic alignment (numbers right, text left)
+                 if _is_numeric(cell_str):
+                      row_str.append(cell_str.rjust(col_widths[i]))
+                 else:
+                      row_str.append(cell_str.ljust(col_widths[i]))
 
             result.append(" | ".join(row_str))
 
@@ -534,56 +770,41 @@ class keywordParser:
                         cell_text = str(cell_value)
 
                     cell = table.cell(i, j)
-                    # Check if cell contains multiple paragraphs and clear extra ones
-                    if len(cell.paragraphs) > 1:
-                         for p in cell.paragraphs[1:]:
-                              p.clear() # Remove extra default paragraphs
-                    # Ensure there's at least one paragraph to write to
-                    if not cell.paragraphs:
-                         cell.add_paragraph()
-
-                    run = cell.paragraphs[0].clear().add_run(cell_text) # Clear and add new run
-
 
-                    # Apply consistent font size
-                    run.font.size = Pt(10)
-
-                    # Apply padding within cells (apply to paragraph format)
-                    cell.paragraphs[0].paragraph_format.space_before = Pt(3)
-                    cell.paragraphs[0].paragraph_format.space_after = Pt(3)
-
-                    # Format header row (first row)
+                    # Header row (first row) is bold and centered,
+                    # right-align numbers (including currency) for better readability
                     if i == 0:
-                        run.font.bold = True
-                        # Add light gray shading to header row
-                        tcPr = cell._tc.get_or_add_tcPr()
-                        shading_elm = parse_xml(f'<w:shd {nsdecls("w")} w:fill="D9D9D9"/>')
-                        tcPr.append(shading_elm)
-                        cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+                        template, alignment = _HEADER_CELL_PARAGRAPH, WD_ALIGN_PARAGRAPH.CENTER
+                    elif _is_numeric(cell_value):
+                        template, alignment = _RIGHT_CELL_PARAGRAPH, WD_ALIGN_PARAGRAPH.RIGHT
                     else:
-                         # Right-align numbers for better readability
-                         # More robust check for numbers including currency
-                        is_numeric = False
-                        try:
-                             # Try converting after removing currency symbols and commas
-                             float(str(cell_value).replace('$', '').replace(',', ''))
-                             is_numeric = True
-                        except (ValueError, TypeError):
-                             is_numeric = False
-
-                        if is_numeric:
-                             cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.RIGHT
+                        template, alignment = _LEFT_CELL_PARAGRAPH, WD_ALIGN_PARAGRAPH.LEFT
+
+                    if _RUN_BREAKS_RE.search(cell_text):
+                        # Tabs and line breaks need python-docx's run handling
+                        self._write_table_cell(cell, cell_text, alignment, bold=(i == 0))
+                    else:
+                        # Plain text - replace the cell's paragraphs with a copy of the formatted one
+                        tc = cell._tc
+                        for p in tc.p_lst:
+                            tc.remove(p)
+                        paragraph = copy.deepcopy(template)
+                        run_elm = paragraph.r_lst[0]
+                        text_elm = run_elm.t_lst[0]
+                        if not cell_text:
+                            run_elm.remove(text_elm) # An empty run has no <w:t>, as with add_run("")
                         else:
-                             cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.LEFT
+                            text_elm.text = cell_text
+                            if cell_text != cell_text.strip():
+                                text_elm.set(qn("xml:space"), "preserve")
+                        tc.append(paragraph)
 
-            # Apply alternating row colors (excluding header)
-            for i in range(1, num_rows):
-                if i % 2 != 0:  # Apply shading to odd rows (1, 3, 5...)
-                    for j in range(num_cols):
-                        cell = table.cell(i, j)
-                        tcPr = cell._tc.get_or_add_tcPr()
-                        shading_elm = parse_xml(f'<w:shd {nsdecls("w")} w:fill="F5F5F5"/>')  # Very light gray
-                        tcPr.append(shading_elm)
+                    # Light gray shading for the header row, and
+                    # alternating row colors (excluding header) - shade odd rows (1, 3, 5...)
+                    if i == 0:
+                        cell._tc.get_or_add_tcPr().append(copy.deepcopy(_HEADER_SHADING))
+                    elif i % 2 != 0:
+                        cell._tc.get_or_add_tcPr().append(copy.deepcopy(_ALT_ROW_SHADING))
 
         except Exception as e:
             # If enhanced formatting fails, continue with basic table
@@ -596,6 +817,28 @@ class keywordParser:
         # Return a placeholder - the actual table has been added to the document
         return "[TABLE_INSERTED]"
 
+    def _write_table_cell(self, cell, cell_text, alignment, bold=False):
+        """Write text into a Word table cell through python-docx paragraphs and runs."""
+        # cell.paragraphs rebuilds its list from the XML on every access, so read it once
+        paragraphs = cell.paragraphs
+        # Check if cell contains multiple paragraphs and clear extra ones
+        for p in paragraphs[1:]:
+             p.clear() # Remove extra default paragraphs
+        # Ensure there's at least one paragraph to write to
+        paragraph = paragraphs[0] if paragraphs else cell.add_paragraph()
+
+        run = paragraph.clear().add_run(cell_text) # Clear and add new run
+
+        # Apply consistent font size
+        run.font.size = Pt(10)
+        if bold:
+            run.font.bold = True
+
+        # Apply padding within cells (apply to paragraph format)
+        paragraph.paragraph_format.space_before = Pt(3)
+        paragraph.paragraph_format.space_after = Pt(3)
+        paragraph.alignment = alignment
+
 
     def _process_template_keyword(self, content):
         """Process template keywords using '!' separator."""
@@ -604,86 +847,40 @@ class keywordParser:
 
         try:
             # Split into filename and optional parameters using '!'
-            parts = content.split("!")
-            filename = parts[0].strip()
+            filename, has_params, param_part = content.partition("!")
+            filename = filename.strip()
 
             # Handle library templates {{TEMPLATE!LIBRARY!template_name!version}}
             if filename.upper() == "LIBRARY":
-                 if len(parts) > 1:
-                     template_name = parts[1].strip() if len(parts) > 1 else ""
-                     template_version = parts[2].strip() if len(parts) > 2 else "DEFAULT"
+                 if has_params:
+                     template_name, has_version, template_version = param_part.partition("!")
+                     template_name = template_name.strip()
+                     template_version = template_version.partition("!")[0].strip() if has_version else "DEFAULT"
                      # Implement template library lookup here
                      return f"[Template Library: {template_name} (Version: {template_version})]"
                  return "[Invalid library template reference]"
 
 
-            # Handle file-based templates
-            if not os.path.exists(filename):
+            # Handle file-based templates - the modification time is needed for the cache anyway
+            try:
+                mtime_ns = os.stat(filename).st_mtime_ns
+            except FileNotFoundError:
                 return f"[Template file not found: {filename}]"
 
-            # Read the file
-            with open(filename, 'r', encoding='utf-8') as file: # Added encoding
-                file_content = file.read()
+            # Read the file (cached until it is modified)
+            template_key = (os.path.abspath(filename), mtime_ns)
+            file_content = _read_template(*template_key)
 
             # Check for additional parameters (section, line, paragraph, vars)
-            if len(parts) > 1:
-                param_part = "!".join(parts[1:]) # Rejoin params in case '!' is in value
-
-                 # Handle section/bookmark {{TEMPLATE!filename.docx!section=name}}
-                if param_part.startswith("section="):
-                    section_name = param_part.split("section=")[1].split(",")[0].strip()
-                    # Implement section extraction logic here
-                    return f"[Section {section_name} from {filename}]"
-
-                # Handle specific line {{TEMPLATE!filename.txt!line=5}}
-                elif param_part.startswith("line="):
-                    try:
-                        line_number = int(param_part.split("line=")[1].split(",")[0].strip())
-                        lines = file_content.splitlines()
-                        if 0 <= line_number - 1 < len(lines): # Adjust for 0-based index
-                            return lines[line_number - 1]
-                        return f"[Line {line_number} not found in {filename}]"
-                    except (ValueError, IndexError):
-                         return f"[Invalid line number in {param_part}]"
-
-
-                # Handle specific paragraph {{TEMPLATE!filename.docx!paragraph=3}}
-                elif param_part.startswith("paragraph="):
-                    try:
-                         para_number = int(param_part.split("paragraph=")[1].split(",")[0].strip())
-                         # Simple paragraph split (might need refinement based on docx structure)
-                         paragraphs = file_content.split("\n\n")
-                         if 0 <= para_number - 1 < len(paragraphs): # Adjust for 0-based index
-                             return paragraphs[para_number - 1]
-                         return f"[Paragraph {para_number} not found in {filename}]"
-                    except (ValueError, IndexError):
-                         return f"[Invalid paragraph number in {param_part}]"
-
-
-                # Handle variable substitution {{TEMPLATE!filename.docx!VARS(name=John,date=2025-04-01)}}
-                elif param_part.startswith("VARS("):
-                    try:
-                         vars_text = param_part.split("VARS(")[1].split(")")[0]
-                         var_pairs = vars_text.split(",")
-
-                         # Create a dictionary of variables
-                         variables = {}
-                         for pair in var_pairs:
-                             if "=" in pair:
-                                 key, value = pair.split("=", 1)
-                                 # Recursively parse value if it's a keyword
-                                 variables[key.strip()] = self.parse(value.strip())
-
-
-                         # Replace variables in the template
-                         result = file_content
-                         for key, value in variables.items():
-                             result = result.replace(f"{{{key}}}", str(value)) # Ensure value is string
-
-                         return result
-                    except IndexError:
-                         return f"[Invalid VARS format in {param_part}]"
-
+            if has_params: # param_part keeps any further '!' in the value
+                # One match finds which parameter it is, the handler parses its value
+                param_match = _TEMPLATE_PARAM_RE.match(param_part)
+                if param_match:
+                    prefix = param_match.group(0)
+                    # Value up to any repeat of the prefix, as split(prefix)[1] would give
+                    value = param_part[len(prefix):].split(prefix)[0]
+                    handler = self._template_param_handlers[prefix]
+                    return handler(self, filename, template_key, file_content, param_part, value)
 
             # Return the entire file content if no specific parameters
             return file_content
@@ -693,6 +890,64 @@ class keywordParser:
             return f"[Error in TEMPLATE: {str(e)}]"
 
 
+    def _template_section(self, filename, template_key, file_content, param_part, value):
+        """Handle section/bookmark {{TEMPLATE!filename.docx!section=name}}"""
+        section_name = value.split(",")[0].strip()
+        # Implement section extraction logic here
+        return f"[Section {section_name} from {filename}]"
+
+    def _template_line(self, filename, template_key, file_content, param_part, value):
+        """Handle specific line {{TEMPLATE!filename.txt!line=5}}"""
+        try:
+            line_number = int(value.split(",")[0].strip())
+            lines = _template_lines(*template_key)
+            if 0 <= line_number - 1 < len(lines): # Adjust for 0-based index
+                return lines[line_number - 1]
+            return f"[Line {line_number} not found in {filename}]"
+        except (ValueError, IndexError):
+             return f"[Invalid line number in {param_part}]"
+
+    def _template_paragraph(self, filename, template_key, file_content, param_part, value):
+        """Handle specific paragraph {{TEMPLATE!filename.docx!paragraph=3}}"""
+        try:
+             para_number = int(value.split(",")[0].strip())
+             # Simple paragraph split (might need refinement based on docx structure)
+             paragraphs = file_content.split("\n\n")
+             if 0 <= para_number - 1 < len(paragraphs): # Adjust for 0-based index
+                 return paragraphs[para_number - 1]
+             return f"[Paragraph {para_number} not found in {filename}]"
+        except (ValueError, IndexError):
+             return f"[Invalid paragraph number in {param_part}]"
+
+    def _template_vars(self, filename, template_key, file_content, param_part, value):
+        """Handle variable substitution {{TEMPLATE!filename.docx!VARS(name=John,date=2025-04-01)}}"""
+        vars_text = value.split(")")[0]
+        var_pairs = vars_text.split(",")
+
+        # Create a dictionary of variables
+        variables = {}
+        for pair in var_pairs:
+            if "=" in pair:
+                key, var_value = pair.split("=", 1)
+                # Recursively parse value if it's a keyword
+                variables[key.strip()] = self.parse(var_value.strip())
+
+        if not variables:
+            return file_content
+
+        # Replace all {key} placeholders in one pass - inserted values are not searched again
+        values = {key: str(var_value) for key, var_value in variables.items()} # Ensure value is string
+        return _template_vars_re(tuple(values)).sub(lambda match: values[match.group(1)], file_content)
+
+    # Template parameter prefix -> handler
+    _template_param_handlers = {
+        "section=": _template_section,
+        "line=": _template_line,
+        "paragraph=": _template_paragraph,
+        "VARS(": _template_vars,
+    }
+
+
     def _process_json_keyword(self, content):
         """Process JSON keywords using '!' separator."""
         if not content:
@@ -700,61 +955,69 @@ class keywordParser:
 
         try:
              # Split into filename, path, and optional transformation using '!'
-            parts = content.split("!")
-            if len(parts) < 2: return "[Invalid JSON format: Filename and path required]"
+            filename, has_path, path_part = content.partition("!")
+            if not has_path: return "[Invalid JSON format: Filename and path required]"
 
-            filename = parts[0].strip()
-            json_path = parts[1].strip()
-            transform_type = parts[2].strip().upper() if len(parts) > 2 else None
+            filename = filename.strip()
+            json_path, has_transform, transform_type = path_part.partition("!")
+            json_path = json_path.strip()
+            # Any parts after the transformation are ignored
+            transform_type = transform_type.partition("!")[0].strip().upper() if has_transform else None
 
 
             # Check if filename is from another reference
-            if filename.startswith("{{") and filename.endswith("}}"):
+            if _is_keyword_ref(filename):
                 # Recursively parse the reference
-                filename = self.parse(filename)
+                filename = self._parse_keyword_ref(filename)
 
-            # Check if file exists
-            if not os.path.exists(filename):
+            # Check if file exists - its modification time is needed for the cache anyway
+            try:
+                mtime_ns = os.stat(filename).st_mtime_ns
+            except FileNotFoundError:
                 return f"[JSON file not found: {filename}]"
 
-            # Read the JSON file
-            with open(filename, 'r', encoding='utf-8') as file: # Added encoding
-                json_data = json.load(file)
+            # Read the JSON file (cached until it is modified)
+            json_data = _load_json(os.path.abspath(filename), mtime_ns)
 
             # Simplistic JSONPath implementation (needs a library for full support)
             if json_path.startswith("$."):
-                path_parts = json_path[2:].split(".")
                 current = json_data
+                steps = _compile_jsonpath(json_path)
+
+                keys = _simple_jsonpath(json_path)
+                if keys is not None:
+                    # Plain keys only - look them up directly
+                    try:
+                        current = functools.reduce(operator.getitem, keys, json_data)
+                        steps = () # Found, nothing left to walk
+                    except (KeyError, IndexError, TypeError):
+                        pass # Walk the steps below to report which key is missing
+
+                for step, arg in steps:
+                    if step == "array":
+                        if arg not in current: return f"[JSON key not found: {arg}]"
+                        current = current[arg]
+                        if not isinstance(current, list): return f"[JSON path error: {arg} is not an array]"
+
+                    elif step == "index":
+                        try:
+                            if arg >= len(current): return f"[JSON index out of bounds: {arg}]"
+                            current = current[arg]
+                        except (IndexError, TypeError):
+                            return f"[Invalid JSON array index: {arg}]"
+
+                    elif step == "wild":
+                        # This simplistic implementation doesn't fully support complex [*] behavior
+                        # It might just return the list itself or error if used mid-path incorrectly
+                        # A proper JSONPath library is needed for full support
+                        pass # 'current' remains the list for now
+
+                    elif step == "bad_index":
+                        return f"[Invalid JSON array index: {arg}]"
 
-                for part in path_parts:
-                    # Handle array indexing like array[0] or [*]
-                    if "[" in part and part.endswith("]"):
-                        key = part.split("[")[0]
-                        index_str = part.split("[")[1][:-1]
-
-                        # Handle accessing the array itself if key is empty
-                        if key:
-                            if key not in current: return f"[JSON key not found: {key}]"
-                            current = current[key]
-                            if not isinstance(current, list): return f"[JSON path error: {key} is not an array]"
-
-                        # Handle index or wildcard
-                        if index_str == '*':
-                             # This simplistic implementation doesn't fully support complex [*] behavior
-                             # It might just return the list itself or error if used mid-path incorrectly
-                             # A proper JSONPath library is needed for full support
-                             pass # 'current' remains the list for now
-                        else:
-                             try:
-                                 index = int(index_str)
-                                 if index >= len(current): return f"[JSON index out of bounds: {index}]"
-                                 current = current[index]
-                             except (ValueError, IndexError, TypeError):
-                                 return f"[Invalid JSON array index: {index_str}]"
                     else:
-                        # Handle dynamic property names using keywords
-                        if part.startswith("{{") and part.endswith("}}"):
-                            part = self.parse(part) # Recursively parse key
+                        # Dynamic property names are parsed on every call, as their value may change
+                        part = self._parse_keyword_ref(arg) if step == "ref" else arg
 
                         if not isinstance(current, dict) or part not in current:
                              return f"[JSON key not found: {part}]"
@@ -762,36 +1025,10 @@ class keywordParser:
 
 
                  # Check for transformations if specified as the third part
-                if transform_type:
-                    if transform_type == "SUM" and isinstance(current, list):
-                        try:
-                            # Attempt to sum, converting elements to float
-                             return sum(float(str(x).replace(',','').replace('$','')) for x in current if x is not None)
-                        except (ValueError, TypeError):
-                            return f"[Cannot SUM non-numeric values in list]"
-
-                    elif transform_type.startswith("JOIN(") and transform_type.endswith(")"):
-                        delimiter = transform_type[5:-1]
-                        if isinstance(current, list):
-                            return delimiter.join(str(x) for x in current if x is not None)
-                        return str(current) # Join on single item returns the item as string
-
-
-                    elif transform_type.startswith("BOOL(") and transform_type.endswith(")"):
-                         yes_no = transform_type[5:-1].split("/")
-                         yes_text = yes_no[0] if len(yes_no) > 0 else "Yes"
-                         no_text = yes_no[1] if len(yes_no) > 1 else "No"
-
-                         # Handle boolean conversion robustly
-                         bool_value = False
-                         if isinstance(current, bool):
-                              bool_value = current
-                         elif isinstance(current, str):
-                              bool_value = current.lower() in ['true', 'yes', '1', 'on']
-                         elif isinstance(current, (int, float)):
-                              bool_value = current != 0
-
-                         return yes_text if bool_value else no_text
+                transform = _JSON_TRANSFORM_RE.fullmatch(transform_type) if transform_type else None
+                if transform:
+                    handler = self._json_transform_handlers[transform.group("name") or transform.group("func")]
+                    return handler(self, current, transform.group("args"))
 
                 # Return the final value if no transformation or if transformation failed
                 return current
@@ -808,24 +1045,72 @@ class keywordParser:
             return f"[Error in JSON: {str(e)}]"
 
 
+    # Keyword type -> handler. INPUT keywords should already be handled by the form in parse(),
+    # their handler is a fallback if not (e.g., in tester_app without form)
+    _keyword_handlers = {
+        "XL": _process_excel_keyword,
+        "INPUT": _process_input_keyword,
+        "TEMPLATE": _process_template_keyword,
+        "JSON": _process_json_keyword,
+    }
+
+    def _json_sum(self, current, args):
+        """Handle SUM - sum numeric values in an array"""
+        if not isinstance(current, list):
+            return current
+        values = [x for x in current if x is not None]
+        # Plain JSON numbers need no text cleanup
+        if all(type(x) is int or type(x) is float for x in values):
+            return sum(map(float, values))
+        try:
+            # Attempt to sum, converting elements to float
+             return sum(float(str(x).translate(_NUMBER_SYMBOLS)) for x in values)
+        except (ValueError, TypeError):
+            return "[Cannot SUM non-numeric values in list]"
+
+    def _json_join(self, current, delimiter):
+        """Handle JOIN(delimiter) - join array items with a delimiter"""
+        if isinstance(current, list):
+            items = [x for x in current if x is not None]
+            # Lists of strings can be joined as they are
+            if all(type(x) is str for x in items):
+                return delimiter.join(items)
+            return delimiter.join([str(x) for x in items])
+        return str(current) # Join on single item returns the item as string
+
+    def _json_bool(self, current, args):
+        """Handle BOOL(YesText/NoText) - transform boolean to custom text"""
+        yes_no = args.split("/")
+        yes_text = yes_no[0] if len(yes_no) > 0 else "Yes"
+        no_text = yes_no[1] if len(yes_no) > 1 else "No"
+
+        # Handle boolean conversion robustly - any other type is False
+        to_bool = _JSON_BOOL_CONVERTERS.get(type(current))
+        bool_value = to_bool(current) if to_bool else False
+
+        return yes_text if bool_value else no_text
+
+    # JSON transformation name -> handler
+    _json_transform_handlers = {
+        "SUM": _json_sum,
+        "JOIN": _json_join,
+        "BOOL": _json_bool,
+    }
+
+
     def reset_form_state(self):
         """Reset the form submission state and clear cached values."""
         self.form_submitted = False
         self.input_values = {}
+        self.keyword_cache = {}
+        self._table_data_cache = {}
 
     def clear_input_cache(self):
         """Clear the cached user inputs stored in session state (for Streamlit apps)."""
-        # Find all INPUT keys in session state derived from input fields and clear them
-        keys_to_clear = [key for key in st.session_state.keys() if key.startswith("input_field_INPUT!")]
-        for key in keys_to_clear:
-            # Reset based on type - needs knowledge of type or safe reset
-             if isinstance(st.session_state[key], bool):
-                 st.session_state[key] = False # Default for checkbox
-             elif isinstance(st.session_state[key], (int, float)):
-                  st.session_state[key] = 0 # Default for number (if ever used)
-             else:
-                 st.session_state[key] = "" # Default for text/area/select/date
-
+        # Reset the input fields created in this session - based on type, with a safe default
+        for key in st.session_state.get(_INPUT_FIELD_KEYS, ()):
+            if key in st.session_state:
+                st.session_state[key] = _INPUT_FIELD_DEFAULTS.get(type(st.session_state[key]), "")
 
         # Also clear the parser's internal state
         self.reset_form_state()
@@ -839,57 +1124,4 @@ class keywordParser:
         Returns:
             A string with help information about available keywords.
         """
-        help_text = """
-        ## Keyword System Help (using '!' separator)
-
-        ### Excel Data Keywords (`{{XL!...}}`)
-        Keywords to fetch data from an Excel file.
-
-        * **`{{XL!CELL!cell_ref}}`**: Get value from a single cell.
-            * Example: `{{XL!CELL!A1}}`
-            * Example with sheet: `{{XL!CELL!SheetName!B5}}`
-        * **`{{XL!LAST!cell_ref}}`**: Get the last non-empty value going down from `cell_ref`.
-            * Example: `{{XL!LAST!A1}}`
-            * Example with sheet: `{{XL!LAST!SheetName!B5}}`
-        * **`{{XL!LAST!sheet_name!cell_ref!Title}}`**: Find column by `Title` in the row of `cell_ref`, then get the last non-empty value below `Title`.
-            * Example: `{{XL!LAST!Items!A4!Total Project Costs}}`
-        * **`{{XL!RANGE!range_ref}}`**: Get values from a range (e.g., `A1:C5` or `NamedRange`). Returns a formatted table.
-            * Example: `{{XL!RANGE!A1:C5}}`
-            * Example with sheet: `{{XL!RANGE!SheetName!A1:C5}}`
-            * Example with named range: `{{XL!RANGE!MyNamedRange}}`
-        * **`{{XL!COLUMN!sheet_name!col_refs}}`**: Get specified columns starting from `col_refs` (e.g., "A1,C1,E1"). Returns a table.
-            * Example: `{{XL!COLUMN!Items!A4,E4,F4}}`
-        * **`{{XL!COLUMN!sheet_name!"Titles"!start_row}}`**: Get columns by `Titles` (e.g., "Revenue,Expense,Profit") found in `start_row`. Returns a table.
-            * Example: `{{XL!COLUMN!Items!"Activities,HST,Total Project Costs"!4}}` (Finds titles in row 4)
-
-        ### User Input Keywords (`{{INPUT!...}}`)
-        Keywords to create interactive input fields.
-
-        * **`{{INPUT!text!label!default_value}}`**: Single-line text input.
-        * **`{{INPUT!area!label!default_value!height}}`**: Multi-line text area (optional height in pixels).
-        * **`{{INPUT!date!label!default_date!format}}`**: Date picker (`default_date` can be 'today' or 'YYYY/MM/DD'). `format` is optional (e.g., 'YYYY/MM/DD', 'DD/MM/YYYY').
-        * **`{{INPUT!select!label!option1,option2,...}}`**: Dropdown selection.
-        * **`{{INPUT!check!label!default_state}}`**: Checkbox (`default_state` is 'True' or 'False').
-
-        ### Template Keywords (`{{TEMPLATE!...}}`)
-        Keywords to include content from other files or libraries.
-
-        * **`{{TEMPLATE!filename.docx}}`**: Include entire external template file.
-        * **`{{TEMPLATE!filename.docx!section=name}}`**: Include specific section/bookmark.
-        * **`{{TEMPLATE!filename.txt!line=5}}`**: Include specific line number from text file.
-        * **`{{TEMPLATE!filename.docx!paragraph=3}}`**: Include specific paragraph number.
-        * **`{{TEMPLATE!filename.docx!VARS(key1=val1,key2=val2)}}`**: Template with variable substitution (values can be keywords).
-        * **`{{TEMPLATE!LIBRARY!template_name!version}}`**: Reference template from a predefined library (optional version).
-
-        ### JSON Data Keywords (`{{JSON!...}}`)
-        Keywords to fetch data from JSON files using JSONPath.
-
-        * **`{{JSON!filename.json!json_path}}`**: Access data using JSONPath (e.g., `$.key`, `$.array[0].name`).
-            * Example: `{{JSON!config.json!$.settings.theme}}`
-            * Example: `{{JSON!data.json!$.users[1].email}}`
-        * **`{{JSON!filename.json!json_path!TRANSFORMATION}}`**: Apply optional transformation.
-            * `SUM`: Sum numeric values in an array. (`{{JSON!data.json!$.values!SUM}}`)
-            * `JOIN(delimiter)`: Join array items with a delimiter. (`{{JSON!data.json!$.names!JOIN(,)}}`)
-            * `BOOL(YesText/NoText)`: Transform boolean to custom text. (`{{JSON!config.json!$.enabled!BOOL(Active/Inactive)}}`)
-        """
-        return help_text 
\ No newline at end of file
+        return _KEYWORD_HELP_TEXT 
\ No newline at end of file
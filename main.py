@@ -1,26 +1,52 @@
 # main.py
 import streamlit as st
-import os
 import re
+import io
 import docx
-import tempfile
 import time
-from excel_manager import excelManager # Assuming excel_manager.py is in the same directory
+from excel_manager import excelManager, configure_logging # Assuming excel_manager.py is in the same directory
 from keyword_parser import keywordParser # Assuming keyword_parser.py is in the same directory
 from collections import Counter
+from docx.table import _Cell
+from docx.oxml.simpletypes import ST_Merge
+
+# Keyword placeholders like {{XL!CELL!A1}} - compiled once for every scan.
+# Group 1 is the whole content; 'kind' is the stripped text before the first '!'
+# and 'body' everything after it (None when there is no '!').
+KEYWORD_RE = re.compile(r'{{(?P<content>[^\S\n]*(?P<kind>[^!\n]*?)[^\S\n]*(?:!(?P<body>.*?))?)}}')
+
+def iter_all_paragraphs(doc, unique=False):
+    """
+    Yield every paragraph of a Word document in one walk: body paragraphs first,
+    then the paragraphs inside each table cell.
+
+    By default a merged cell is yielded once for every grid cell it spans, as
+    table.rows/row.cells present it. With unique=True the cell elements are
+    streamed straight from the table XML, so each cell is yielded once and the
+    row/cell grid is never built.
+    """
+    yield from doc.paragraphs
+    for table in doc.tables:
+        if unique:
+            for tc in table._tbl.iter_tcs():
+                if tc.vMerge != ST_Merge.CONTINUE: # Continuations show the cell above
+                    yield from _Cell(tc, table).paragraphs
+        else:
+            for row in table.rows:
+                for cell in row.cells:
+                    yield from cell.paragraphs
 
 def preprocess_word_doc(doc_path):
     """
     Analyze a Word document to determine what keywords it contains, using '!' separator.
 
     Args:
-        doc_path: Path to the Word document
+        doc_path: Path to the Word document, or a file-like object holding it
 
     Returns:
         Dictionary with keyword counts and whether Excel file is needed
     """
     doc = docx.Document(doc_path)
-    pattern = r'{{(.*?)}}'
 
     keywords = {
         "excel": {"CELL": [], "LAST": [], "RANGE": [], "COLUMN": [], "OTHER": []},
@@ -32,68 +58,57 @@ def preprocess_word_doc(doc_path):
     needs_excel = False
     total_keywords = 0
 
-    def categorize_keyword(content):
+    def categorize_excel(content, body):
         nonlocal needs_excel
-        parts = content.split("!", 1) # Use '!' separator
-        keyword_type = parts[0].strip().upper()
-
-        if not keyword_type: return # Ignore empty keywords {{}}
-
-        if keyword_type == "XL":
-            needs_excel = True
-            if len(parts) > 1:
-                sub_parts = parts[1].split("!", 1)
-                xl_subtype = sub_parts[0].strip().upper()
-                if xl_subtype in keywords["excel"]:
-                    keywords["excel"][xl_subtype].append(content)
-                else:
-                     # If subtype unknown, check if it looks like an old format/named range
-                     if ':' not in parts[1] and '!' not in parts[1]: # Likely named range or old cell ref
-                          keywords["excel"]["RANGE"].append(content) # Assume RANGE for named range
-                     else:
-                          keywords["excel"]["OTHER"].append(content) # Potentially old or invalid format
+        needs_excel = True
+        if body is not None:
+            xl_subtype = body.split("!", 1)[0].strip().upper()
+            if xl_subtype in keywords["excel"]:
+                keywords["excel"][xl_subtype].append(content)
             else:
-                 keywords["excel"]["OTHER"].append(content) # Invalid XL format {{XL}}
-
-        elif keyword_type == "INPUT":
-            if len(parts) > 1:
-                input_parts = parts[1].split("!")
-                input_type = input_parts[0].lower() if input_parts else "text"
-                if input_type in keywords["input"]:
-                    keywords["input"][input_type].append(content)
-                else:
-                    keywords["input"]["text"].append(content)
+                 # If subtype unknown, check if it looks like an old format/named range
+                 if ':' not in body and '!' not in body: # Likely named range or old cell ref
+                      keywords["excel"]["RANGE"].append(content) # Assume RANGE for named range
+                 else:
+                      keywords["excel"]["OTHER"].append(content) # Potentially old or invalid format
+        else:
+             keywords["excel"]["OTHER"].append(content) # Invalid XL format {{XL}}
+
+    def categorize_input(content, body):
+        if body is not None:
+            input_type = body.split("!", 1)[0].lower()
+            if input_type in keywords["input"]:
+                keywords["input"][input_type].append(content)
             else:
-                 keywords["input"]["text"].append(content) # {{INPUT}} defaults to text
+                keywords["input"]["text"].append(content)
+        else:
+             keywords["input"]["text"].append(content) # {{INPUT}} defaults to text
 
-        elif keyword_type == "TEMPLATE":
-            keywords["template"].append(content)
-        elif keyword_type == "JSON":
-            keywords["json"].append(content)
+    def categorize_other(content, body):
+        nonlocal needs_excel
+        # If not a recognized type, check if it might be an Excel named range
+        if body is None and ':' not in content:
+             needs_excel = True
+             keywords["excel"]["RANGE"].append(content) # Treat as potential named range
         else:
-             # If not a recognized type, check if it might be an Excel named range
-             if '!' not in content and ':' not in content:
-                  needs_excel = True
-                  keywords["excel"]["RANGE"].append(content) # Treat as potential named range
-             else:
-                  keywords["other"].append(content)
-
-    # Scan paragraphs
-    for paragraph in doc.paragraphs:
-        matches = list(re.finditer(pattern, paragraph.text))
+             keywords["other"].append(content)
+
+    # Keyword type (text before the first '!') -> categorizer
+    categorizers = {
+        "XL": categorize_excel,
+        "INPUT": categorize_input,
+        "TEMPLATE": lambda content, body: keywords["template"].append(content),
+        "JSON": lambda content, body: keywords["json"].append(content),
+    }
+
+    # Scan paragraphs and tables
+    for paragraph in iter_all_paragraphs(doc):
+        matches = list(KEYWORD_RE.finditer(paragraph.text))
         total_keywords += len(matches)
         for match in matches:
-            categorize_keyword(match.group(1))
-
-    # Scan tables
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for paragraph in cell.paragraphs:
-                    matches = list(re.finditer(pattern, paragraph.text))
-                    total_keywords += len(matches)
-                    for match in matches:
-                        categorize_keyword(match.group(1))
+            keyword_type = match.group('kind').upper()
+            if not keyword_type: continue # Ignore empty keywords {{}}
+            categorizers.get(keyword_type, categorize_other)(match.group(1), match.group('body'))
 
     summary = {
         "total_keywords": total_keywords,
@@ -113,7 +128,7 @@ def process_word_doc(doc_path, excel_path=None, parser=None):
     Process a Word document, replacing keywords with values using the provided parser.
 
     Args:
-        doc_path: Path to the Word document
+        doc_path: Path to the Word document, or a file-like object holding it
         excel_path: Path to the Excel spreadsheet (optional - manager passed via parser)
         parser: An initialized keywordParser instance
 
@@ -126,18 +141,16 @@ def process_word_doc(doc_path, excel_path=None, parser=None):
     doc = docx.Document(doc_path)
     parser.set_word_document(doc) # Ensure parser has the correct document object
 
-    pattern = r'{{(.*?)}}'
+    # Walk the document once, keeping only the paragraphs that contain keywords.
+    # Merged table cells are visited once, since they share one set of paragraphs.
     total_keywords_initial = 0
-
-    # Count initial keywords
-    elements_to_scan = list(doc.paragraphs)
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                elements_to_scan.extend(cell.paragraphs)
-
-    for paragraph in elements_to_scan:
-        total_keywords_initial += len(re.findall(pattern, paragraph.text))
+    elements_to_process = []
+    for paragraph in iter_all_paragraphs(doc, unique=True):
+        text = paragraph.text
+        matches = list(KEYWORD_RE.finditer(text))
+        if matches:
+            total_keywords_initial += len(matches)
+            elements_to_process.append((paragraph, text, matches))
 
     if total_keywords_initial == 0:
         st.warning("No keywords found in the document.")
@@ -150,47 +163,48 @@ def process_word_doc(doc_path, excel_path=None, parser=None):
     # Process paragraph by paragraph, letting the parser handle replacements
     processed_keywords_count = 0
     elements_processed = 0
-    total_elements = len(elements_to_scan)
-
-    for paragraph in elements_to_scan:
-        original_text = paragraph.text
-        keywords_in_para = len(re.findall(pattern, original_text))
+    total_elements = len(elements_to_process)
+    # Each widget update is a round trip to the browser, so refresh about once per percent
+    update_every = max(1, total_elements // 100)
+
+    for paragraph, original_text, matches in elements_to_process:
+        try:
+            # parser.parse will handle replacements, including potential table insertion
+            processed_text = parser.parse(original_text)
+            new_text = processed_text
+
+            # Handle table insertion placeholder
+            if "[TABLE_INSERTED]" in processed_text:
+                # Check if the keyword was the only content (strip spaces for check),
+                # reusing the matches found during the scan
+                is_only_keyword = False
+                if len(matches) == 1 and matches[0].group(0).strip() == original_text.strip():
+                     is_only_keyword = True
+
+                if is_only_keyword:
+                     new_text = "" # Clear paragraph if only table keyword was present
+                else:
+                     # Remove placeholder but keep other text
+                     new_text = processed_text.replace("[TABLE_INSERTED]", "").strip()
+                paragraph.text = new_text
+            elif processed_text != original_text:
+                paragraph.text = processed_text
 
-        if keywords_in_para > 0:
-            try:
-                # parser.parse will handle replacements, including potential table insertion
-                processed_text = parser.parse(original_text)
-
-                # Handle table insertion placeholder
-                if "[TABLE_INSERTED]" in processed_text:
-                    # Check if the keyword was the only content (strip spaces for check)
-                    is_only_keyword = False
-                    matches = list(re.finditer(pattern, original_text))
-                    if len(matches) == 1 and matches[0].group(0).strip() == original_text.strip():
-                         is_only_keyword = True
-
-                    if is_only_keyword:
-                         paragraph.text = "" # Clear paragraph if only table keyword was present
-                    else:
-                         # Remove placeholder but keep other text
-                         paragraph.text = processed_text.replace("[TABLE_INSERTED]", "").strip()
-                elif processed_text != original_text:
-                    paragraph.text = processed_text
-
-                # Estimate progress - count keywords *remaining* after parse
-                keywords_remaining = len(re.findall(pattern, paragraph.text))
-                processed_in_step = keywords_in_para - keywords_remaining
-                processed_keywords_count += processed_in_step
+            # Estimate progress - count keywords *remaining* after parse
+            keywords_remaining = len(KEYWORD_RE.findall(new_text))
+            processed_in_step = len(matches) - keywords_remaining
+            processed_keywords_count += processed_in_step
 
-            except Exception as e:
-                st.error(f"Error processing content '{original_text[:50]}...': {str(e)}")
-                # Keep original text on error
+        except Exception as e:
+            st.error(f"Error processing content '{original_text[:50]}...': {str(e)}")
+            # Keep original text on error
 
         elements_processed += 1
-        progress = elements_processed / total_elements if total_elements > 0 else 0
-        progress_bar.progress(progress)
-        # Update text based on estimated keywords processed vs initial total
-        progress_text.text(f"Processing: {processed_keywords_count}/{total_keywords_initial} keywords estimated...")
+        if elements_processed % update_every == 0:
+            progress = elements_processed / total_elements if total_elements > 0 else 0
+            progress_bar.progress(progress)
+            # Update text based on estimated keywords processed vs initial total
+            progress_text.text(f"Processing: {processed_keywords_count}/{total_keywords_initial} keywords estimated...")
 
 
     progress_bar.progress(1.0)
@@ -256,10 +270,10 @@ def main():
     # --- State Management ---
     # Initialize state variables if they don't exist
     default_state = {
-        'doc_uploaded': False, 'doc_path': None, 'analysis_summary': None,
-        'excel_uploaded': False, 'excel_path': None, 'excel_manager_instance': None,
+        'doc_uploaded': False, 'doc_bytes': None, 'doc_name': None, 'analysis_summary': None,
+        'excel_uploaded': False, 'excel_bytes': None, 'excel_manager_instance': None,
         'keyword_parser_instance': None, 'form_submitted_main': False, 'input_values_main': {},
-        'processing_started': False, 'processed_doc_path': None, 'processed_count': 0
+        'processing_started': False, 'processed_doc_bytes': None, 'processed_doc_name': None, 'processed_count': 0
     }
     for key, value in default_state.items():
         if key not in st.session_state:
@@ -267,10 +281,6 @@ def main():
 
     # --- Reset Button ---
     if st.sidebar.button("Reset Application State"):
-        # Clean up temp files
-        if st.session_state.doc_path and os.path.exists(st.session_state.doc_path): os.unlink(st.session_state.doc_path)
-        if st.session_state.excel_path and os.path.exists(st.session_state.excel_path): os.unlink(st.session_state.excel_path)
-        if st.session_state.processed_doc_path and os.path.exists(st.session_state.processed_doc_path): os.unlink(st.session_state.processed_doc_path)
         # Close Excel Manager if open
         if st.session_state.excel_manager_instance: st.session_state.excel_manager_instance.close()
         # Reset state variables
@@ -285,10 +295,9 @@ def main():
     if doc_file and not st.session_state.doc_uploaded:
          # Reset relevant states for new upload
         st.session_state.update({k: v for k, v in default_state.items() if k not in ['keyword_parser_instance_for_help']}) # Keep help parser
-        # Save new doc
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_doc:
-            tmp_doc.write(doc_file.getvalue())
-            st.session_state.doc_path = tmp_doc.name
+        # Keep the new doc in memory - python-docx reads it straight from a stream
+        st.session_state.doc_bytes = doc_file.getvalue()
+        st.session_state.doc_name = doc_file.name
         st.session_state.doc_uploaded = True
         st.rerun()
 
@@ -298,7 +307,7 @@ def main():
         if not st.session_state.analysis_summary:
             st.info("Analyzing document...")
             try:
-                summary = preprocess_word_doc(st.session_state.doc_path)
+                summary = preprocess_word_doc(io.BytesIO(st.session_state.doc_bytes))
                 st.session_state.analysis_summary = summary
                 st.rerun()
             except Exception as e:
@@ -313,11 +322,8 @@ def main():
             if needs_excel:
                 excel_file = st.file_uploader("Upload Required Excel Spreadsheet (.xlsx)", type=["xlsx"], key="main_excel_uploader")
                 if excel_file and not st.session_state.excel_uploaded:
-                    # Save new excel file
-                    if st.session_state.excel_path and os.path.exists(st.session_state.excel_path): os.unlink(st.session_state.excel_path) # Clean old temp excel
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_excel:
-                        tmp_excel.write(excel_file.getvalue())
-                        st.session_state.excel_path = tmp_excel.name
+                    # Keep the new excel file in memory - excelManager can load it from a stream
+                    st.session_state.excel_bytes = excel_file.getvalue()
                     st.session_state.excel_uploaded = True
                     # Reset excel manager instance as file changed
                     if st.session_state.excel_manager_instance: st.session_state.excel_manager_instance.close()
@@ -328,9 +334,9 @@ def main():
 
 
             # --- Initialize Managers (only once per valid file state) ---
-            if needs_excel and st.session_state.excel_path and not st.session_state.excel_manager_instance:
+            if needs_excel and st.session_state.excel_bytes and not st.session_state.excel_manager_instance:
                  try:
-                      st.session_state.excel_manager_instance = excelManager(st.session_state.excel_path)
+                      st.session_state.excel_manager_instance = excelManager(io.BytesIO(st.session_state.excel_bytes), mode="r") # Only read while filling the document
                  except Exception as e:
                       st.error(f"Failed to load Excel file: {e}")
                       st.session_state.excel_uploaded = False # Reset upload status
@@ -353,18 +359,17 @@ def main():
                            temp_inputs = {}
                            # Use analysis summary to find all input keywords (more reliable than parser state)
                            all_input_keywords = [item for sublist in st.session_state.analysis_summary['keywords']['input'].values() for item in sublist]
-                           unique_input_contents = sorted(list(set(all_input_keywords))) # Get unique input definitions
+                           unique_input_contents = sorted(set(all_input_keywords)) # Get unique input definitions
 
                            for content in unique_input_contents:
                                 # Create field using parser's helper function (doesn't store value in parser here)
-                                # Key must be unique and stable for Streamlit form state
-                                field_key = f"form_{content}"
                                 temp_inputs[content] = parser._create_input_field(content) # Use unique key inside
 
                            submitted = st.form_submit_button("Submit Inputs")
                            if submitted:
-                                # Store the submitted values based on their content definition
-                                st.session_state.input_values_main = {content: st.session_state.get(f"form_{content}", "") for content in unique_input_contents}
+                                # Store the submitted values based on their content definition - the
+                                # widgets already returned them, so there is nothing to look up again
+                                st.session_state.input_values_main = temp_inputs
                                 st.session_state.form_submitted_main = True
                                 # Update the parser's internal values for the processing step
                                 parser.input_values = {}
@@ -391,7 +396,7 @@ def main():
 
             if st.button("Process Document", disabled=process_button_disabled, key="main_process_btn"):
                 st.session_state.processing_started = True
-                st.session_state.processed_doc_path = None # Clear previous
+                st.session_state.processed_doc_bytes = None # Clear previous
 
                 st.info("Processing document... This may take a moment.")
                 try:
@@ -405,21 +410,19 @@ def main():
 
                      # Process
                      processed_doc, count = process_word_doc(
-                          st.session_state.doc_path,
-                          st.session_state.excel_path,
+                          io.BytesIO(st.session_state.doc_bytes),
                           parser=parser
                      )
 
                      if processed_doc:
-                          tmp_folder = "tmp_processed_main"
-                          if not os.path.exists(tmp_folder): os.makedirs(tmp_folder)
                           # Use original filename for output
-                          base_name = os.path.basename(st.session_state.doc_path)
-                          output_filename = f"processed_{base_name}" if not base_name.startswith("tmp") else "processed_document.docx"
-                          output_path = os.path.join(tmp_folder, output_filename)
+                          output_filename = f"processed_{st.session_state.doc_name}"
 
-                          processed_doc.save(output_path)
-                          st.session_state.processed_doc_path = output_path
+                          # Serialize straight into memory for the download button - no file on disk
+                          buffer = io.BytesIO()
+                          processed_doc.save(buffer)
+                          st.session_state.processed_doc_bytes = buffer.getvalue()
+                          st.session_state.processed_doc_name = output_filename
                           st.session_state.processed_count = count
                           st.success(f"Processing Complete! Approximately {count} keywords processed.")
                           # Rerun needed to show download button correctly after processing finishes
@@ -439,21 +442,17 @@ def main():
 
 
             # --- Step 5: Download ---
-            if st.session_state.processed_doc_path:
+            if st.session_state.processed_doc_bytes:
                  st.header("Step 5: Download Result")
                  st.success(f"Document processed. Approximately {st.session_state.processed_count} keywords replaced.")
-                 try:
-                     with open(st.session_state.processed_doc_path, "rb") as fp:
-                          st.download_button(
-                               label="Download Processed Document",
-                               data=fp,
-                               file_name=os.path.basename(st.session_state.processed_doc_path),
-                               mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                          )
-                 except FileNotFoundError:
-                      st.error("Processed file not found. Please try processing again.")
-                      st.session_state.processed_doc_path = None # Reset path
+                 st.download_button(
+                      label="Download Processed Document",
+                      data=st.session_state.processed_doc_bytes,
+                      file_name=st.session_state.processed_doc_name,
+                      mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+                 )
 
 
 if __name__ == "__main__":
+    configure_logging("excel_manager.log")
     main()
\ No newline at end of file
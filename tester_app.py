@@ -3,9 +3,11 @@ import os
 import pandas as pd
 import tempfile
 import json
-from excel_manager import excelManager
+from excel_manager import excelManager, configure_logging
 from keyword_parser import keywordParser
 
+configure_logging("excel_manager.log")
+
 st.title("Excel Manager App")
 
 # Initialize session state